@@ -0,0 +1,335 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.messages import HumanMessage
+
+import lab_1_2_solution as router
+
+# Lab 1.2 PII Gateway: an asyncio ASGI service in front of the PII router.
+#
+# Requests are queued in a bounded asyncio.Queue (full queue -> 503, so clients
+# back off instead of piling up latency) and grouped into micro-batches by a
+# pool of workers. Each batch is screened with ONE detector pass over all of
+# its messages (router.screen_batch: the graph's check_pii + redact logic
+# without a graph run per message), then every forwarded message awaits the
+# downstream model concurrently, so many batches are in flight without threads.
+#
+# Endpoints:
+#   POST /v1/route   {"message": "..."} -> route, PII types, forwarded text, response
+#   GET  /metrics    p50/p99 latency, QPS, batch sizes, queue depth, rejections
+#   GET  /healthz
+#
+# Run a local load test against a mock downstream model (no network needed):
+#   python lab_1_2_gateway.py --requests 5000 --concurrency 500
+# Serve over HTTP (requires uvicorn):
+#   python lab_1_2_gateway.py --serve --port 8000
+
+Downstream = Callable[[str], Awaitable[str]]
+
+class MockDownstreamModel:
+    """Async stand-in for an internal LLM endpoint with configurable latency"""
+
+    def __init__(self, latency: float = 0.02, jitter: float = 0.01):
+        self.latency = latency
+        self.jitter = jitter
+
+    async def __call__(self, prompt: str) -> str:
+        await asyncio.sleep(self.latency + random.random() * self.jitter)
+        return f"Processed: I received your request '{prompt}' and it is safe to handle."
+
+class GatewayStopped(Exception):
+    """Raised for requests still queued or in flight when the gateway stops"""
+
+class GatewayMetrics:
+    """Request latency percentiles over a sliding sample window, plus counters"""
+
+    def __init__(self, window: int = 10000):
+        self.latencies = deque(maxlen=window)
+        self.started = time.perf_counter()
+        self.completed = 0
+        self.rejected = 0
+        self.failed = 0
+        self.batches = 0
+        self.batched_requests = 0
+
+    def record(self, latency: float):
+        self.latencies.append(latency)
+        self.completed += 1
+
+    def record_batch(self, size: int):
+        self.batches += 1
+        self.batched_requests += size
+
+    def snapshot(self, queue_depth: int = 0) -> Dict:
+        ordered = sorted(self.latencies)
+
+        def pct(p: float) -> float:
+            if not ordered:
+                return 0.0
+            return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000
+
+        elapsed = time.perf_counter() - self.started
+        return {
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "qps": self.completed / elapsed if elapsed else 0.0,
+            "p50_ms": pct(50),
+            "p99_ms": pct(99),
+            "mean_batch_size": self.batched_requests / self.batches if self.batches else 0.0,
+            "queue_depth": queue_depth,
+        }
+
+class PIIGateway:
+    """
+    ASGI application serving the PII router's screening logic.
+
+    Batches are screened with router.screen_batch (the graph's check_pii and
+    redact steps in one detector pass) and answered by `downstream`; the
+    compiled graph itself is not run per request.
+
+    Args:
+        downstream: Async callable answering sanitized prompts (default: mock model)
+        workers: Micro-batches processed concurrently
+        max_batch_size: Requests screened per detector pass
+        max_batch_delay: Seconds a worker waits to fill a batch after the first request
+        queue_size: Pending requests accepted before answering 503
+    """
+
+    def __init__(
+        self,
+        downstream: Optional[Downstream] = None,
+        workers: int = 8,
+        max_batch_size: int = 32,
+        max_batch_delay: float = 0.002,
+        queue_size: int = 2048,
+    ):
+        self.downstream = downstream or MockDownstreamModel()
+        self.workers = workers
+        self.max_batch_size = max_batch_size
+        self.max_batch_delay = max_batch_delay
+        self.queue_size = queue_size
+        self.metrics = GatewayMetrics()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    # --- Worker pool ---
+
+    async def start(self):
+        if self._queue is None:
+            self.metrics.started = time.perf_counter()
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Stop the workers; queued and in-flight requests fail with GatewayStopped"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future, _ = self._queue.get_nowait()
+                if not future.done():
+                    future.set_exception(GatewayStopped("gateway stopped"))
+        self._queue = None
+
+    async def submit(self, message: str) -> Dict:
+        """Queue one message and wait for its result; raises asyncio.QueueFull under overload"""
+        await self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((message, future, time.perf_counter()))
+        return await future
+
+    async def _fill_batch(self, batch: List[Tuple[str, asyncio.Future, float]]):
+        """Append up to max_batch_size requests to `batch`, waiting at most max_batch_delay after the first"""
+        batch.append(await self._queue.get())
+        deadline = time.perf_counter() + self.max_batch_delay
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+    async def _worker(self):
+        while True:
+            # Filled in place, so requests taken off the queue are failed below
+            # even if the worker is cancelled while the batch is still filling
+            batch: List[Tuple[str, asyncio.Future, float]] = []
+            try:
+                await self._fill_batch(batch)
+                await self._run_batch(batch)
+            except asyncio.CancelledError:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(GatewayStopped("gateway stopped"))
+                raise
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future, float]]):
+        self.metrics.record_batch(len(batch))
+        try:
+            screened = router.screen_batch([HumanMessage(content=message) for message, _, _ in batch])
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            self.metrics.failed += len(batch)
+            return
+        replies = await asyncio.gather(
+            *(self.downstream(forwarded.content) for _, forwarded, _ in screened),
+            return_exceptions=True,
+        )
+        for (_, future, submitted), (route, forwarded, spans), reply in zip(batch, screened, replies):
+            if future.done():
+                continue
+            if isinstance(reply, Exception):
+                future.set_exception(reply)
+                self.metrics.failed += 1
+                continue
+            future.set_result({
+                "route": route,
+                "pii_types": sorted({span["pii_type"] for span in spans}),
+                "forwarded_message": forwarded.content,
+                "response": reply,
+            })
+            self.metrics.record(time.perf_counter() - submitted)
+
+    # --- ASGI ---
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        method, path = scope["method"], scope["path"]
+        if method == "POST" and path == "/v1/route":
+            status, payload = await self._handle_route(receive)
+        elif method == "GET" and path == "/metrics":
+            depth = self._queue.qsize() if self._queue else 0
+            status, payload = 200, self.metrics.snapshot(depth)
+        elif method == "GET" and path == "/healthz":
+            status, payload = 200, {"status": "ok"}
+        else:
+            status, payload = 404, {"error": "not found"}
+
+        body = json.dumps(payload).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"),
+                        (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _handle_route(self, receive) -> Tuple[int, Dict]:
+        body = b""
+        while True:
+            event = await receive()
+            body += event.get("body", b"")
+            if not event.get("more_body"):
+                break
+        try:
+            message = json.loads(body)["message"]
+            if not isinstance(message, str):
+                raise TypeError("message must be a string")
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {"error": f"expected JSON body {{\"message\": str}}: {e}"}
+        try:
+            return 200, await self.submit(message)
+        except asyncio.QueueFull:
+            self.metrics.rejected += 1
+            return 503, {"error": "gateway overloaded, retry later"}
+        except GatewayStopped:
+            return 503, {"error": "gateway shutting down, retry later"}
+        except Exception as e:
+            return 502, {"error": f"downstream failure: {e}"}
+
+    async def _lifespan(self, receive, send):
+        while True:
+            event = await receive()
+            if event["type"] == "lifespan.startup":
+                await self.start()
+                await send({"type": "lifespan.startup.complete"})
+            elif event["type"] == "lifespan.shutdown":
+                await self.stop()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+# --- Local load test ---
+
+async def run_load_test(gateway: PIIGateway, n_requests: int = 2000, concurrency: int = 200) -> Dict:
+    """Drive the ASGI app in-process through httpx and return the gateway's metrics"""
+    import httpx
+
+    samples = [
+        "Tell me about the NIST AI RMF.",
+        "My Social Security Number is 123-45-6789.",
+        "Summarize the GOVERN function for our board.",
+        "Charge it to 4111 1111 1111 1111, email me at jane.doe@example.com",
+    ]
+    semaphore = asyncio.Semaphore(concurrency)
+    statuses: Dict[int, int] = {}
+
+    async def one(client, i):
+        async with semaphore:
+            response = await client.post("/v1/route", json={"message": samples[i % len(samples)]})
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    await gateway.start()
+    transport = httpx.ASGITransport(app=gateway)
+    async with httpx.AsyncClient(transport=transport, base_url="http://gateway") as client:
+        await asyncio.gather(*(one(client, i) for i in range(n_requests)))
+        metrics = (await client.get("/metrics")).json()
+    await gateway.stop()
+    metrics["http_statuses"] = statuses
+    return metrics
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lab 1.2 PII gateway (ASGI)")
+    parser.add_argument("--serve", action="store_true", help="Serve over HTTP with uvicorn")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent micro-batches")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--batch-delay", type=float, default=0.002, help="Seconds to fill a batch")
+    parser.add_argument("--queue-size", type=int, default=2048)
+    parser.add_argument("--latency", type=float, default=0.02, help="Mock downstream latency (s)")
+    parser.add_argument("--requests", type=int, default=2000, help="Load test requests")
+    parser.add_argument("--concurrency", type=int, default=200, help="Load test concurrent clients")
+    args = parser.parse_args()
+
+    gateway = PIIGateway(
+        downstream=MockDownstreamModel(latency=args.latency),
+        workers=args.workers,
+        max_batch_size=args.batch_size,
+        max_batch_delay=args.batch_delay,
+        queue_size=args.queue_size,
+    )
+
+    if args.serve:
+        try:
+            import uvicorn
+        except ImportError:
+            raise SystemExit("Serving requires uvicorn: pip install uvicorn")
+        uvicorn.run(gateway, host="127.0.0.1", port=args.port)
+    else:
+        print("### Lab 1.2: PII Gateway Load Test (mock downstream) ###")
+        metrics = asyncio.run(run_load_test(gateway, args.requests, args.concurrency))
+        print(f"\n{'='*70}")
+        print(f"Requests: {metrics['completed']} ok, {metrics['rejected']} rejected, {metrics['failed']} failed")
+        print(f"HTTP statuses: {metrics['http_statuses']}")
+        print(f"QPS: {metrics['qps']:.0f}")
+        print(f"Latency p50: {metrics['p50_ms']:.1f} ms, p99: {metrics['p99_ms']:.1f} ms")
+        print(f"Mean batch size: {metrics['mean_batch_size']:.1f}")
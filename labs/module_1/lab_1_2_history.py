@@ -0,0 +1,133 @@
+import hashlib
+import json
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from langchain_core.messages import BaseMessage
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+# Bounded conversation history for the Lab 1.2 PII Router state.
+#
+# `Annotated[list[BaseMessage], operator.add]` concatenates lists on every step,
+# so a long session copies an ever-growing history. MessageWindow keeps only the
+# newest messages; older ones are folded into a running summary and a hash-chain
+# checkpoint, so state size and per-step copy cost are bounded by the window.
+
+# (previous summary, newly evicted messages, total evicted so far) -> new summary
+Summarizer = Callable[[str, Sequence[BaseMessage], int], str]
+
+def count_summary(previous: str, evicted: Sequence[BaseMessage], total_evicted: int) -> str:
+    """Default summarizer: record only how much history was dropped"""
+    return f"{total_evicted} earlier message(s) omitted"
+
+@dataclass(frozen=True)
+class MessageWindow:
+    """
+    The most recent messages plus a compact record of evicted ones.
+
+    Behaves like a read-only sequence of the recent messages, so nodes can keep
+    using state['messages'][-1]. `checkpoint` is a SHA-256 chain over every
+    evicted message: two sessions with the same digest dropped the same history,
+    which is enough for audit without keeping the (possibly sensitive) text.
+    """
+    recent: Tuple[BaseMessage, ...] = ()
+    evicted_count: int = 0
+    summary: str = ""
+    checkpoint: str = ""
+
+    def __post_init__(self):
+        # Checkpointer serializers may hand the tuple back as a list
+        if not isinstance(self.recent, tuple):
+            object.__setattr__(self, "recent", tuple(self.recent))
+
+    def __getitem__(self, index):
+        return self.recent[index]
+
+    def __len__(self) -> int:
+        return len(self.recent)
+
+    def __iter__(self) -> Iterator[BaseMessage]:
+        return iter(self.recent)
+
+# Types this module puts in graph state. LangGraph's checkpoint serializer only
+# trusts registered msgpack types (unregistered ones log a warning today and are
+# blocked under LANGGRAPH_STRICT_MSGPACK=true), so checkpointers must allow these.
+CHECKPOINT_TYPES = [(MessageWindow.__module__, MessageWindow.__name__)]
+
+def checkpoint_serializer() -> JsonPlusSerializer:
+    """
+    Checkpoint serializer that can restore MessageWindow state.
+
+    Pass it to the checkpointer of any graph using bounded_messages, e.g.
+    `InMemorySaver(serde=checkpoint_serializer())`.
+    """
+    return JsonPlusSerializer(allowed_msgpack_modules=CHECKPOINT_TYPES)
+
+def _chain_digest(previous: str, message: BaseMessage) -> str:
+    content = message.content if isinstance(message.content, str) else json.dumps(message.content)
+    h = hashlib.sha256(previous.encode("utf-8"))
+    h.update(b"\x00" + message.type.encode("utf-8") + b"\x00" + content.encode("utf-8"))
+    return h.hexdigest()
+
+def bounded_messages(max_messages: int = 20, summarize: Optional[Summarizer] = None):
+    """
+    Build a LangGraph reducer that keeps at most `max_messages` messages.
+
+    Use as `messages: Annotated[MessageWindow, bounded_messages(20)]`. Updates may
+    be a message, a list of messages, or a MessageWindow (which replaces the state,
+    e.g. when restoring a saved session). Like LangGraph's add_messages, messages
+    without an id get one, and a message whose id is already in the window
+    replaces that message in place (e.g. a redacted copy of the user's input).
+    Each step copies at most the window, never the full history. Checkpointed
+    graphs need a checkpointer built with checkpoint_serializer().
+
+    Args:
+        max_messages: Messages kept verbatim
+        summarize: Folds evicted messages into the summary (default: a count);
+            plug in an LLM summarizer here for richer context
+    """
+    if max_messages < 1:
+        raise ValueError("max_messages must be at least 1")
+    summarize = summarize or count_summary
+
+    def reduce_messages(
+        current: Optional[MessageWindow],
+        update: Union[BaseMessage, List[BaseMessage], MessageWindow],
+    ) -> MessageWindow:
+        if isinstance(update, MessageWindow):
+            return update
+        current = current if isinstance(current, MessageWindow) else MessageWindow(tuple(current or ()))
+        new = (update,) if isinstance(update, BaseMessage) else tuple(update)
+        if not new:
+            return current
+        new = tuple(m if m.id else m.model_copy(update={"id": str(uuid.uuid4())}) for m in new)
+        recent = current.recent
+        rows = {m.id: i for i, m in enumerate(recent)}
+        if any(m.id in rows for m in new):
+            replaced = list(recent)
+            for m in new:
+                if m.id in rows:
+                    replaced[rows[m.id]] = m
+            recent = tuple(replaced)
+            new = tuple(m for m in new if m.id not in rows)
+        # Evict oldest-first; only the surviving window is copied
+        overflow = len(recent) + len(new) - max_messages
+        if overflow <= 0:
+            return MessageWindow(recent + new, current.evicted_count, current.summary, current.checkpoint)
+        if len(new) >= max_messages:
+            evicted, kept = recent + new[:-max_messages], new[-max_messages:]
+        else:
+            evicted, kept = recent[:overflow], recent[overflow:] + new
+        checkpoint = current.checkpoint
+        for message in evicted:
+            checkpoint = _chain_digest(checkpoint, message)
+        evicted_count = current.evicted_count + len(evicted)
+        return MessageWindow(
+            kept,
+            evicted_count,
+            summarize(current.summary, evicted, evicted_count),
+            checkpoint,
+        )
+
+    return reduce_messages
@@ -0,0 +1,88 @@
+import hashlib
+import hmac
+import os
+import string
+from typing import Iterable, Optional
+
+from lab_1_2_pii_detector import PIIMatch
+
+# Span-level redaction for the Lab 1.2 PII Router.
+#
+# Uses the offsets returned by PIIDetector to rebuild the message in a single
+# pass (untouched slices + replacements, joined once) instead of chaining
+# str.replace calls that copy the whole message per hit.
+#
+# Modes:
+#   mask     - letters/digits become '*', separators are kept:  ***-**-****
+#   hash     - keyed HMAC digest per value:                     [SSN:3f9a0c1e52b7]
+#   tokenize - format-preserving pseudonym (digits stay digits, letters stay
+#              letters, punctuation kept):                      482-91-0375
+#
+# hash and tokenize are deterministic for a given key, so the same value maps
+# to the same replacement across messages. Set PII_REDACTION_KEY to keep that
+# mapping stable across processes; otherwise a random per-process key is used.
+
+REDACTION_MODES = ("mask", "hash", "tokenize")
+
+# Match types that are PII values. KEYWORD matches ("SSN", "Credit Card") only
+# mention PII, so they are left in place and do not send a message to redaction.
+VALUE_PII_TYPES = ("SSN", "CREDIT_CARD", "EMAIL", "PHONE")
+
+class Redactor:
+    """Replace detected PII value spans (VALUE_PII_TYPES) in a message"""
+
+    def __init__(self, mode: str = "mask", key: Optional[bytes] = None, mask_char: str = "*",
+                 types: Iterable[str] = VALUE_PII_TYPES):
+        if mode not in REDACTION_MODES:
+            raise ValueError(f"Unknown redaction mode '{mode}' (use one of {', '.join(REDACTION_MODES)})")
+        if key is None:
+            env_key = os.getenv("PII_REDACTION_KEY")
+            key = env_key.encode("utf-8") if env_key else os.urandom(32)
+        self.mode = mode
+        self.key = key
+        self.mask_char = mask_char
+        self.types = frozenset(types)
+
+    def redact(self, text: str, matches: Iterable[PIIMatch]) -> str:
+        """Return text with every value match replaced; overlapping spans keep the first"""
+        parts = []
+        last = 0
+        for match in sorted(matches, key=lambda m: m.start):
+            if match.pii_type not in self.types or match.start < last:
+                continue
+            parts.append(text[last:match.start])
+            parts.append(self.replacement(match))
+            last = match.end
+        if not parts:
+            return text
+        parts.append(text[last:])
+        return "".join(parts)
+
+    def replacement(self, match: PIIMatch) -> str:
+        if self.mode == "mask":
+            return "".join(self.mask_char if c.isalnum() else c for c in match.text)
+        digest = self._digest(match)
+        if self.mode == "hash":
+            return f"[{match.pii_type}:{digest.hex()[:12]}]"
+        return _format_preserving(match.text, digest)
+
+    def _digest(self, match: PIIMatch) -> bytes:
+        message = f"{match.pii_type}\x00{match.text}".encode("utf-8")
+        return hmac.new(self.key, message, hashlib.sha256).digest()
+
+def _format_preserving(value: str, digest: bytes) -> str:
+    """Pseudonymize value character by character, keeping its shape"""
+    stream = digest
+    while len(stream) < len(value):
+        stream += hashlib.sha256(stream).digest()
+    out = []
+    for c, b in zip(value, stream):
+        if c.isdigit():
+            out.append(string.digits[b % 10])
+        elif c.isupper():
+            out.append(string.ascii_uppercase[b % 26])
+        elif c.islower():
+            out.append(string.ascii_lowercase[b % 26])
+        else:
+            out.append(c)
+    return "".join(out)
@@ -1,52 +1,104 @@
-import operator
-from typing import Annotated, TypedDict, Union
+import os
+from typing import Annotated, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypedDict, Union
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, END
 
+from lab_1_2_history import MessageWindow, bounded_messages
+from lab_1_2_pii_detector import DEFAULT_DETECTOR, PIIMatch
+from lab_1_2_redactor import VALUE_PII_TYPES, Redactor
+
+# Redaction applied to PII spans: mask, hash or tokenize (see lab_1_2_redactor.py)
+REDACTOR = Redactor(mode=os.getenv("PII_REDACTION_MODE", "mask"))
+
+# Messages kept verbatim per session; older ones are summarized (see lab_1_2_history.py)
+HISTORY_WINDOW = int(os.getenv("PII_ROUTER_HISTORY_WINDOW", "20"))
+
+# Node status logging default; override per run with
+# app.invoke(inputs, config={"configurable": {"verbose": False}})
+VERBOSE = True
+
+def log(message: str, config: Optional[RunnableConfig] = None):
+    configurable = (config or {}).get("configurable", {})
+    if configurable.get("verbose", VERBOSE):
+        print(message)
+
 # Define the State
 class AgentState(TypedDict):
-    # The 'messages' key will hold a list of messages, and add_messages will append to it
-    messages: Annotated[list[BaseMessage], operator.add]
+    # The 'messages' key holds the newest HISTORY_WINDOW messages; the reducer appends
+    # new ones and folds evicted ones into a summary + checkpoint, so state stays bounded
+    messages: Annotated[MessageWindow, bounded_messages(HISTORY_WINDOW)]
     pii_detected: bool
+    # Types and offsets only ({"pii_type", "start", "end"}); never the PII text
+    pii_matches: list[dict]
+
+def has_pii_values(matches: Iterable[PIIMatch]) -> bool:
+    """True if any match is a PII value; keyword-only mentions ("Credit Card") are safe"""
+    return any(m.pii_type in VALUE_PII_TYPES for m in matches)
+
+def pii_spans(matches: Iterable[PIIMatch]) -> List[dict]:
+    """Strip matched text, keeping what is safe to store in state and checkpoints"""
+    return [{"pii_type": m.pii_type, "start": m.start, "end": m.end} for m in matches]
 
 # --- Nodes ---
 
-def check_pii_node(state: AgentState):
+def check_pii_node(state: AgentState, config: RunnableConfig):
     """
-    Simulated PII detection node.
-    Checks for keywords like 'SSN', 'Credit Card', 'Social Security'.
+    PII detection node.
+    Scans the last message in one pass for SSNs, credit card numbers (Luhn-checked),
+    emails, phone numbers and keywords like 'SSN', 'Credit Card', 'Social Security'.
+    Only values route to redaction; a message that merely mentions a keyword
+    ("Is a Credit Card number covered?") is processed as is.
     """
-    print("--- Node: Checking for PII ---")
+    log("--- Node: Checking for PII ---", config)
     messages = state['messages']
     last_message = messages[-1].content
     
-    # Simple keyword detection for simulation
-    pii_keywords = ["SSN", "Social Security", "Credit Card", "1234-5678"]
-    found_pii = any(keyword in last_message for keyword in pii_keywords)
+    # Every span is needed for redaction, and the text is already in memory, so
+    # a plain scan() is used; scan_stream() pays off for files and sockets
+    matches = DEFAULT_DETECTOR.scan(last_message)
+    found_pii = has_pii_values(matches)
     
     if found_pii:
-        print(f"  [ALERT] PII Detected in message: '{last_message[:20]}...'")
+        # Log types and offsets only, never the sensitive text itself
+        spans = ", ".join(f"{m.pii_type}@{m.start}-{m.end}" for m in matches)
+        log(f"  [ALERT] PII Detected in message: {spans}", config)
+    elif matches:
+        log("  [OK] PII keywords mentioned, no PII values.", config)
     else:
-        print("  [OK] No PII detected.")
+        log("  [OK] No PII detected.", config)
         
-    return {"pii_detected": found_pii}
+    return {"pii_detected": found_pii, "pii_matches": pii_spans(matches)}
 
-def redact_node(state: AgentState):
+def redact_node(state: AgentState, config: RunnableConfig):
     """
     Node to handle PII violations.
+    Replaces only the detected spans and passes the sanitized message on to
+    process_node, so the user does not have to resend the request. The
+    sanitized message keeps the original's id, so it overwrites the original
+    in state instead of being appended after it.
     """
-    print("--- Node: Redacting/Blocking ---")
-    return {"messages": [AIMessage(content="BLOCKED: Your message contains Sensitive PII and cannot be processed by the public model.")]}
-
-def process_node(state: AgentState):
+    log("--- Node: Redacting PII ---", config)
+    original = state['messages'][-1]
+    text = original.content
+    matches = [PIIMatch(s["pii_type"], s["start"], s["end"], text[s["start"]:s["end"]])
+               for s in state['pii_matches']]
+    sanitized = REDACTOR.redact(text, matches)
+    redacted = sum(1 for m in matches if m.pii_type in REDACTOR.types)
+    log(f"  [REDACTED] {redacted} span(s) using '{REDACTOR.mode}' mode", config)
+    return {"messages": [HumanMessage(content=sanitized, id=original.id)]}
+
+def process_node(state: AgentState, config: RunnableConfig):
     """
     Node to process safe messages (Mock LLM call).
     """
-    print("--- Node: Processing Safe Request ---")
+    log("--- Node: Processing Safe Request ---", config)
     user_msg = state['messages'][-1].content
+    return {"messages": [processed_reply(user_msg)]}
+
+def processed_reply(user_msg: str) -> AIMessage:
     # In a real app, you'd call an LLM here
-    response = f"Processed: I received your request '{user_msg}' and it is safe to handle."
-    return {"messages": [AIMessage(content=response)]}
+    return AIMessage(content=f"Processed: I received your request '{user_msg}' and it is safe to handle.")
 
 # --- Conditional Logic ---
 
@@ -61,7 +113,13 @@ def route_pii(state: AgentState):
 
 # --- Graph Construction ---
 
-def build_graph():
+def build_graph(checkpointer=None):
+    """
+    Args:
+        checkpointer: Optional LangGraph checkpointer for multi-turn sessions;
+            create it with serde=lab_1_2_history.checkpoint_serializer() so the window
+            is restored without unregistered-type warnings
+    """
     workflow = StateGraph(AgentState)
 
     # Add nodes
@@ -82,11 +140,85 @@ def build_graph():
         }
     )
 
-    # Add edges from leaf nodes to END
-    workflow.add_edge("redact", END)
+    # Redacted messages continue to processing; process is the only leaf
+    workflow.add_edge("redact", "process")
     workflow.add_edge("process", END)
 
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
+
+# --- Batch Routing ---
+
+def screen_batch(
+    messages: Sequence[BaseMessage],
+    redactor: Optional[Redactor] = None,
+) -> List[Tuple[str, BaseMessage, List[dict]]]:
+    """
+    check_pii_node + redact_node for many messages in one detector pass.
+
+    Returns:
+        (route, message to forward, PII spans) per message, in input order;
+        the forwarded message is the redacted copy (same id) when PII was found
+    """
+    redactor = redactor or REDACTOR
+    all_matches = DEFAULT_DETECTOR.scan_batch([m.content for m in messages])
+    screened = []
+    for message, matches in zip(messages, all_matches):
+        route = route_pii({"pii_detected": has_pii_values(matches)})
+        if route == "redact":
+            message = HumanMessage(content=redactor.redact(message.content, matches), id=message.id)
+        screened.append((route, message, pii_spans(matches)))
+    return screened
+
+def route_messages(
+    messages: Iterable[Union[BaseMessage, str]],
+    batch_size: int = 500,
+    verbose: bool = False,
+    redactor: Optional[Redactor] = None,
+) -> Iterator[Dict]:
+    """
+    Route many independent messages without a graph run per message.
+
+    Messages are pulled from the iterable in batches; each batch is checked for
+    PII in one detector pass; messages with PII are redacted span by span, and
+    every message is answered like process_node would. Results are yielded in
+    input order as dicts shaped like the graph's final state plus the route
+    taken, so transcripts and bulk exports can be streamed through. As in the
+    graph, a redacted message replaces the original and pii_matches holds
+    offsets only, so results never carry the detected PII.
+
+    Args:
+        messages: HumanMessages or plain strings
+        batch_size: Messages scanned per detector pass
+        verbose: Print one summary line per batch (nodes' per-message logging is skipped)
+        redactor: Redactor for PII spans (defaults to the module's REDACTOR)
+    """
+    batch: list[BaseMessage] = []
+    batch_number = 0
+
+    def flush():
+        outputs = []
+        for route, message, spans in screen_batch(batch, redactor):
+            outputs.append({
+                "route": route,
+                "messages": [message, processed_reply(message.content)],
+                "pii_detected": route == "redact",
+                "pii_matches": spans,
+            })
+        if verbose:
+            redacted = sum(1 for o in outputs if o["route"] == "redact")
+            print(f"  [BATCH {batch_number}] {len(outputs)} messages: "
+                  f"{redacted} redacted, {len(outputs) - redacted} processed")
+        return outputs
+
+    for message in messages:
+        batch.append(HumanMessage(content=message) if isinstance(message, str) else message)
+        if len(batch) >= batch_size:
+            batch_number += 1
+            yield from flush()
+            batch = []
+    if batch:
+        batch_number += 1
+        yield from flush()
 
 def run_lab_1_2():
     print("### Lab 1.2: PII Router (LangGraph) ###")
@@ -106,5 +238,16 @@ def run_lab_1_2():
         pass
     print(f"Final Output: {output}")
 
+    # Test Case 3: Batch of messages (one detector pass, no per-message graph run)
+    print("\n\n--- Test 3: Batch Input ---")
+    transcript = [
+        "Tell me about the NIST AI RMF.",
+        "My Social Security Number is 123-45-6789.",
+        "Summarize the GOVERN function.",
+        "Charge it to 4111 1111 1111 1111.",
+    ]
+    for result in route_messages(transcript, verbose=True):
+        print(f"  {result['route']:<8} {result['messages'][-1].content[:60]}")
+
 if __name__ == "__main__":
     run_lab_1_2()
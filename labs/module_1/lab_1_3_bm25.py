@@ -0,0 +1,196 @@
+import re
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from lab_1_3_ingest import chunk_id
+
+# Lexical retrieval for Lab 1.3: a BM25 inverted index plus hybrid fusion.
+#
+# Dense embeddings blur exact identifiers such as "GOVERN 1.1" vs "GOVERN 1.2";
+# BM25 over tokens keeps them distinct. Postings are stored CSR-style in three
+# flat NumPy arrays (term offsets, doc ids, term frequencies), so scoring a
+# query is a few array slices and one bincount, with no Python loop over docs.
+
+# Words plus dotted/dashed numbers, so "1.1" and "AC-2" stay single tokens
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.\-][a-z0-9]+)*")
+# A control id inside text, e.g. "GOVERN 1.1", "MAP 1.2", "AC-2"
+CONTROL_ID_SEARCH = re.compile(r"\b[A-Za-z]+(?:[ \-]\d+(?:\.\d+)*)+\b")
+# A whole query that is just a control id
+CONTROL_ID_PATTERN = re.compile(rf"^\s*{CONTROL_ID_SEARCH.pattern}\s*$")
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased word tokens, plus a joined token for every word followed by a
+    number ("govern 1.1" -> "govern_1.1") so control ids also match as a unit.
+    """
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    ids = [f"{a}_{b}" for a, b in zip(tokens, tokens[1:]) if b[0].isdigit() and not a[0].isdigit()]
+    return tokens + ids
+
+def control_ids(text: str) -> FrozenSet[str]:
+    """
+    Control ids mentioned in `text`, each as the single token tokenize() gives
+    it: "GOVERN 1.1" -> "govern_1.1", "AC-2" -> "ac-2".
+    """
+    ids = set()
+    for match in CONTROL_ID_SEARCH.finditer(text):
+        tokens = tokenize(match.group())
+        ids.update([t for t in tokens if "_" in t] or tokens)
+    return frozenset(ids)
+
+class BM25Builder:
+    """
+    Collects chunks for a BM25Index one at a time, so the index can be built
+    while chunks stream past on their way to a vector store.
+    """
+
+    def __init__(self):
+        self.docs: List[Document] = []
+        self.lengths: List[int] = []
+        self.term_docs: Dict[str, List[Tuple[int, int]]] = {}
+
+    def add(self, doc: Document):
+        counts = Counter(tokenize(doc.page_content))
+        doc_index = len(self.docs)
+        self.docs.append(doc)
+        self.lengths.append(sum(counts.values()))
+        for term, tf in counts.items():
+            self.term_docs.setdefault(term, []).append((doc_index, tf))
+
+    def feed(self, docs: Iterable[Document]) -> Iterator[Document]:
+        """Pass `docs` through unchanged, indexing each one on the way"""
+        for doc in docs:
+            self.add(doc)
+            yield doc
+
+    def build(self, k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        return BM25Index.from_builder(self, k1, b)
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of chunks"""
+
+    def __init__(self, docs: Sequence[Document], k1: float = 1.5, b: float = 0.75):
+        builder = BM25Builder()
+        for doc in docs:
+            builder.add(doc)
+        self._index(builder, k1, b)
+
+    @classmethod
+    def from_builder(cls, builder: BM25Builder, k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        index = cls.__new__(cls)
+        index._index(builder, k1, b)
+        return index
+
+    def _index(self, builder: BM25Builder, k1: float, b: float):
+        self.docs = list(builder.docs)
+        self.k1 = k1
+        self.b = b
+
+        term_docs = builder.term_docs
+        lengths = np.asarray(builder.lengths, dtype=np.float32)
+        self.vocab = {term: i for i, term in enumerate(term_docs)}
+        sizes = np.fromiter((len(p) for p in term_docs.values()), dtype=np.int64, count=len(term_docs))
+        self.offsets = np.zeros(len(term_docs) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=self.offsets[1:])
+        self.doc_ids = np.empty(self.offsets[-1], dtype=np.int32)
+        self.term_freqs = np.empty(self.offsets[-1], dtype=np.float32)
+        for i, postings in enumerate(term_docs.values()):
+            start, end = self.offsets[i], self.offsets[i + 1]
+            self.doc_ids[start:end] = [d for d, _ in postings]
+            self.term_freqs[start:end] = [tf for _, tf in postings]
+
+        n = max(len(self.docs), 1)
+        self.idf = np.log(1 + (n - sizes + 0.5) / (sizes + 0.5)).astype(np.float32)
+        avg_length = float(lengths.mean()) if len(lengths) else 1.0
+        # Per-doc part of the BM25 denominator, precomputed once
+        self.length_norm = (k1 * (1 - b + b * lengths / max(avg_length, 1e-9))).astype(np.float32)
+
+    def scores(self, query: str) -> np.ndarray:
+        scores = np.zeros(len(self.docs), dtype=np.float32)
+        for term in set(tokenize(query)):
+            i = self.vocab.get(term)
+            if i is None:
+                continue
+            start, end = self.offsets[i], self.offsets[i + 1]
+            docs = self.doc_ids[start:end]
+            tf = self.term_freqs[start:end]
+            weights = self.idf[i] * tf * (self.k1 + 1) / (tf + self.length_norm[docs])
+            scores += np.bincount(docs, weights=weights, minlength=len(self.docs)).astype(np.float32)
+        return scores
+
+    def search(self, query: str, k: int = 4, required: Iterable[str] = ()) -> List[Tuple[Document, float]]:
+        """Top-k chunks with a positive score, best first; only chunks containing every `required` term"""
+        scores = self.scores(query)
+        for term in required:
+            present = np.zeros(len(self.docs), dtype=bool)
+            i = self.vocab.get(term)
+            if i is not None:
+                present[self.doc_ids[self.offsets[i]:self.offsets[i + 1]]] = True
+            scores[~present] = 0
+        k = min(k, int(np.count_nonzero(scores)))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.docs[i], float(scores[i])) for i in top]
+
+class BM25Retriever(BaseRetriever):
+    """LangChain retriever over a BM25Index"""
+
+    index: BM25Index
+    k: int = 4
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return [doc for doc, _ in self.index.search(query, self.k)]
+
+def _doc_key(doc: Document) -> str:
+    return chunk_id(str(doc.metadata.get("source", "")), doc.page_content)
+
+def reciprocal_rank_fusion(result_lists: Sequence[Sequence[Document]], k: int = 60,
+                           top_n: Optional[int] = None) -> List[Document]:
+    """
+    Merge ranked lists: each document scores sum(1 / (k + rank)) over the lists
+    it appears in. Rank-based, so BM25 and cosine scores need no calibration.
+    """
+    fused: Dict[str, float] = {}
+    by_key: Dict[str, Document] = {}
+    for results in result_lists:
+        for rank, doc in enumerate(results, start=1):
+            key = _doc_key(doc)
+            by_key.setdefault(key, doc)
+            fused[key] = fused.get(key, 0.0) + 1.0 / (k + rank)
+    ranked = sorted(fused, key=fused.get, reverse=True)
+    return [by_key[key] for key in ranked[:top_n]]
+
+class HybridRetriever(BaseRetriever):
+    """
+    BM25 + vector retrieval fused with RRF.
+
+    A query that is only a control id ("GOVERN 1.1") is answered from BM25
+    alone when chunks contain that exact id, skipping the embedding call
+    entirely; a family word alone ("GOVERN" for "GOVERN 9.9") is not enough.
+    """
+
+    bm25: BM25Index
+    vector_retriever: BaseRetriever
+    k: int = 4
+    candidates: int = 20
+    rrf_k: int = 60
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        if CONTROL_ID_PATTERN.match(query):
+            exact = self.bm25.search(query, self.k, required=control_ids(query))
+            if exact:
+                return [doc for doc, _ in exact]
+        lexical = [doc for doc, _ in self.bm25.search(query, self.candidates)]
+        dense = self.vector_retriever.invoke(query, config={"callbacks": run_manager.get_child()})
+        return reciprocal_rank_fusion([lexical, dense], k=self.rrf_k, top_n=self.k)
@@ -8,33 +8,47 @@ from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
 from pinecone import Pinecone, ServerlessSpec
 
+from lab_1_3_embedding_cache import CachedEmbeddings
+from lab_1_3_ingest import IngestManifest, chunk_id, sync_vectorstore
+from lab_1_3_local_index import LocalVectorStore
+from lab_1_3_semantic_cache import SemanticCache, corpus_fingerprint
+
 # Note: Ensure OPENAI_API_KEY and PINECONE_API_KEY are set
 # os.environ["OPENAI_API_KEY"] = "sk-..."
 # os.environ["PINECONE_API_KEY"] = "pc-..."
+# Set VECTOR_BACKEND=local to use the in-process NumPy index instead of Pinecone
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "pinecone")
+# Chunk ids already upserted to Pinecone, so re-runs do not re-embed or duplicate them
+MANIFEST_PATH = "../../data/.cache/ingest_manifest_nist-compliance-lab.json"
+# Previously answered questions; answers are dropped when the corpus changes
+ANSWER_CACHE_DIR = "../../data/.cache/answers_nist-compliance-lab"
 
 def run_lab_1_3():
     print("### Lab 1.3: Compliance RAG (PineCone + LangChain) ###")
     
-    # 1. Setup Pinecone
-    pc_api_key = os.environ.get("PINECONE_API_KEY")
-    if not pc_api_key:
-        print("ERROR: PINECONE_API_KEY not found. Skipping Lab 1.3 execution.")
-        return
-
-    pc = Pinecone(api_key=pc_api_key)
+    # 1. Setup Pinecone (skipped for the local backend)
     index_name = "nist-compliance-lab"
-    
-    # Check if index exists, create if not
-    existing_indexes = [i.name for i in pc.list_indexes()]
-    if index_name not in existing_indexes:
-        print(f"Creating Pinecone index: {index_name}...")
-        pc.create_index(
-            name=index_name,
-            dimension=1536, # OpenAI embedding dimension
-            metric="cosine",
-            spec=ServerlessSpec(cloud="aws", region="us-east-1")
-        )
-        time.sleep(2) # Wait for initialization
+    manifest = IngestManifest(MANIFEST_PATH)
+    if VECTOR_BACKEND != "local":
+        pc_api_key = os.environ.get("PINECONE_API_KEY")
+        if not pc_api_key:
+            print("ERROR: PINECONE_API_KEY not found. Skipping Lab 1.3 execution.")
+            return
+
+        pc = Pinecone(api_key=pc_api_key)
+        
+        # Check if index exists, create if not
+        existing_indexes = [i.name for i in pc.list_indexes()]
+        if index_name not in existing_indexes:
+            print(f"Creating Pinecone index: {index_name}...")
+            pc.create_index(
+                name=index_name,
+                dimension=1536, # OpenAI embedding dimension
+                metric="cosine",
+                spec=ServerlessSpec(cloud="aws", region="us-east-1")
+            )
+            time.sleep(2) # Wait for initialization
+            manifest.sources = {}  # fresh index: nothing has been upserted yet
 
     # 2. Ingest Data (Simulated NIST RMF Content)
     print("Ingesting NIST AI RMF content...")
@@ -51,12 +65,13 @@ def run_lab_1_3():
     
     docs = [Document(page_content=nist_text, metadata={"source": "NIST_AI_RMF_1.0_Snippet"})]
     
-    embeddings = OpenAIEmbeddings()
-    vectorstore = PineconeVectorStore.from_documents(
-        documents=docs,
-        embedding=embeddings,
-        index_name=index_name
-    )
+    # Cached: re-runs and repeated questions skip the embedding API
+    embeddings = CachedEmbeddings(OpenAIEmbeddings())
+    if VECTOR_BACKEND == "local":
+        vectorstore = LocalVectorStore.from_documents(docs, embeddings)
+    else:
+        vectorstore = PineconeVectorStore(index_name=index_name, embedding=embeddings)
+        sync_vectorstore(vectorstore, docs, manifest)
     
     # 3. Create RAG Chain
     retriever = vectorstore.as_retriever()
@@ -75,17 +90,37 @@ def run_lab_1_3():
         | llm
         | StrOutputParser()
     )
+    # Repeated (or reworded) questions are answered without retrieval or the LLM
+    if VECTOR_BACKEND == "local":
+        corpus = corpus_fingerprint(chunk_id(str(d.metadata.get("source", "")), d.page_content) for d in docs)
+    else:
+        # Re-checked on every lookup, so a later sync_vectorstore() drops stale answers
+        corpus = lambda: corpus_fingerprint(manifest.known_ids())
+    answer_cache = SemanticCache(embeddings, corpus, path=ANSWER_CACHE_DIR)
+    chain = answer_cache.wrap(chain)
     
     # 4. Ask Questions
-    query = "What is the purpose of the MAP function?"
-    print(f"\nQuery: {query}")
-    response = chain.invoke(query)
-    print(f"Response: {response}")
+    # Saved even if a question fails, so answers already paid for are kept
+    try:
+        query = "What is the purpose of the MAP function?"
+        print(f"\nQuery: {query}")
+        response = chain.invoke(query)
+        print(f"Response: {response}")
     
-    query2 = "Explain GOVERN 1.1"
-    print(f"\nQuery: {query2}")
-    response2 = chain.invoke(query2)
-    print(f"Response: {response2}")
+        query2 = "Explain GOVERN 1.1"
+        print(f"\nQuery: {query2}")
+        response2 = chain.invoke(query2)
+        print(f"Response: {response2}")
+
+        query3 = "Explain GOVERN 1.1."
+        print(f"\nQuery (repeated): {query3}")
+        start = time.perf_counter()
+        response3 = chain.invoke(query3)
+        print(f"Response ({(time.perf_counter() - start) * 1000:.1f} ms): {response3}")
+    finally:
+        answer_cache.save()
+    print(f"\nAnswer cache: {answer_cache.exact_hits} exact hits, "
+          f"{answer_cache.semantic_hits} semantic hits, {answer_cache.misses} misses")
 
 if __name__ == "__main__":
     run_lab_1_3()
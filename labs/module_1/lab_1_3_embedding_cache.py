@@ -0,0 +1,163 @@
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+# Embedding cache for the Lab 1.3 RAG labs.
+#
+# Vectors are content-addressed by (model, kind, text) and stored as float32
+# blobs in SQLite, with an in-memory LRU in front for hot queries. A call to
+# embed_documents() looks up every text at once and sends only the misses to
+# the provider, deduplicated and in large batches, so re-ingesting a library or
+# re-asking common questions barely touches the embedding API.
+
+DEFAULT_EMBEDDING_CACHE_PATH = "../../data/.cache/embeddings.sqlite"
+
+def embedding_cache_key(model: str, kind: str, text: str) -> str:
+    digest = hashlib.sha256()
+    for part in (model, kind, text):
+        encoded = part.encode("utf-8")
+        # Length-prefix each part so ("ab", "c") and ("a", "bc") hash differently
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wrap any LangChain Embeddings with a disk cache and an in-memory LRU.
+
+    Args:
+        embeddings: The underlying (network) embeddings model
+        path: SQLite file for the persistent cache
+        memory_size: Vectors kept in the in-memory LRU
+        batch_size: Maximum texts per request to the underlying model
+        symmetric: The model embeds queries and documents the same way (OpenAI),
+            so query misses are batched through embed_documents(). Set False for
+            asymmetric models (E5, Cohere input_type): their query misses use the
+            model's embed_queries() batch API if it has one, else embed_query()
+    """
+
+    LOOKUP_CHUNK = 500  # keys per SELECT ... IN (...), below SQLite's variable limit
+    QUERY_WORKERS = 8  # concurrent embed_query() calls in the per-text fallback
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        path: str = DEFAULT_EMBEDDING_CACHE_PATH,
+        memory_size: int = 10_000,
+        batch_size: int = 512,
+        symmetric: bool = True,
+    ):
+        self.embeddings = embeddings
+        self.model = str(getattr(embeddings, "model", None) or type(embeddings).__name__)
+        self.memory_size = memory_size
+        self.batch_size = batch_size
+        self.symmetric = symmetric
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self._conn.commit()
+
+    # --- Embeddings interface ---
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(texts, "document")
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed([text], "query")[0]
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """embed_query() for many texts: one cache lookup, misses embedded in one batch"""
+        return self._embed(texts, "query")
+
+    # --- Cache ---
+
+    def _embed(self, texts: List[str], kind: str) -> List[List[float]]:
+        keys = [embedding_cache_key(self.model, kind, text) for text in texts]
+        found = self._lookup(set(keys))
+
+        # Coalesce misses: each distinct missing text is embedded once, in large batches
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        with self._lock:
+            self.hits += len(texts) - sum(1 for key in keys if key in missing)
+            self.misses += len(missing)
+        if missing:
+            found.update(self._compute(missing, kind))
+        return [found[key].tolist() for key in keys]
+
+    def _lookup(self, keys: set) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+            pending = [key for key in keys if key not in found]
+            for i in range(0, len(pending), self.LOOKUP_CHUNK):
+                chunk = pending[i:i + self.LOOKUP_CHUNK]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+                    self._remember(key, found[key])
+        return found
+
+    def _compute(self, missing: Dict[str, str], kind: str) -> Dict[str, np.ndarray]:
+        keys, texts = list(missing), list(missing.values())
+        computed: Dict[str, np.ndarray] = {}
+        batch_queries = getattr(self.embeddings, "embed_queries", None)
+        if kind == "document" or self.symmetric:
+            vectors = self._batched(self.embeddings.embed_documents, texts)
+        elif batch_queries is not None:
+            vectors = self._batched(batch_queries, texts)
+        elif len(texts) == 1:
+            vectors = [self.embeddings.embed_query(texts[0])]
+        else:
+            # Fallback for asymmetric models without a batch query API: one
+            # embed_query() per text, run concurrently to bound the latency
+            with ThreadPoolExecutor(max_workers=min(len(texts), self.QUERY_WORKERS)) as pool:
+                vectors = list(pool.map(self.embeddings.embed_query, texts))
+        for key, vector in zip(keys, vectors):
+            computed[key] = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, vector.tobytes()) for key, vector in computed.items()],
+            )
+            self._conn.commit()
+            for key, vector in computed.items():
+                self._remember(key, vector)
+        return computed
+
+    def _batched(self, embed, texts: List[str]) -> List[List[float]]:
+        vectors: List[List[float]] = []
+        for i in range(0, len(texts), self.batch_size):
+            vectors.extend(embed(texts[i:i + self.batch_size]))
+        return vectors
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+# Incremental ingestion for the Lab 1.3 vector stores.
+#
+# Every chunk gets a deterministic id derived from its source, its content and
+# the embedding model (so switching models re-embeds everything), and
+# a manifest remembers which ids each source contributed last time. A run then
+# only embeds/upserts chunks whose id is new and deletes ids that disappeared,
+# so re-ingesting an unchanged library costs nothing and an edited file costs
+# only its changed chunks. Deterministic ids also make upserts idempotent:
+# re-sending a chunk overwrites its vector instead of creating a duplicate.
+
+def chunk_id(source: str, content: str, model: str = "") -> str:
+    """Stable vector id for a chunk: SHA-256 over its source, text and embedding model"""
+    h = hashlib.sha256(source.encode("utf-8"))
+    h.update(b"\x00" + content.encode("utf-8"))
+    if model:
+        h.update(b"\x00" + model.encode("utf-8"))
+    return h.hexdigest()[:32]
+
+def embedding_model_name(embeddings: Optional[Embeddings]) -> str:
+    """Model name used in chunk ids (CachedEmbeddings and OpenAIEmbeddings expose .model)"""
+    if embeddings is None:
+        return ""
+    return str(getattr(embeddings, "model", None) or type(embeddings).__name__)
+
+class IngestStats(NamedTuple):
+    added: int
+    removed: int
+    unchanged: int
+
+class IngestManifest:
+    """
+    Record of the chunk ids each source contributed to one vector index.
+
+    Sources missing from a run are treated as deleted, so a manifest should
+    cover one index and one corpus (e.g. everything under DATA_DIR).
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.sources: Dict[str, List[str]] = {}
+        if self.path.exists():
+            with open(self.path, 'r') as f:
+                self.sources = json.load(f).get("sources", {})
+
+    def known_ids(self) -> Set[str]:
+        return {chunk for ids in self.sources.values() for chunk in ids}
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({"sources": self.sources}, f)
+        # Atomic replace so an interrupted save never leaves a truncated manifest
+        os.replace(tmp_path, self.path)
+
+def sync_vectorstore(
+    vectorstore: VectorStore,
+    splits: Iterable[Document],
+    manifest: IngestManifest,
+    batch_size: int = 256,
+    save_manifest: bool = True,
+) -> IngestStats:
+    """
+    Bring a vector store in line with `splits`, touching only the diff.
+
+    `splits` may be a generator (see lab_1_3_pipeline.stream_chunks): new chunks
+    are embedded and upserted under their chunk_id in batches of `batch_size`
+    as they arrive, so upserts overlap with loading. Chunks that no longer
+    exist are deleted once the stream ends, and only then is the manifest saved.
+    Stores that must be persisted separately (LocalVectorStore) pass
+    save_manifest=False and save the manifest after the vectors.
+    """
+    model = embedding_model_name(vectorstore.embeddings)
+    known = manifest.known_ids()
+    current: Dict[str, List[str]] = {}
+    seen: Set[str] = set()
+    batch_docs: List[Document] = []
+    batch_ids: List[str] = []
+    added = 0
+
+    def flush():
+        nonlocal added
+        if batch_docs:
+            vectorstore.add_documents(batch_docs, ids=batch_ids)
+            added += len(batch_ids)
+            batch_docs.clear()
+            batch_ids.clear()
+
+    for doc in splits:
+        source = str(doc.metadata.get("source", ""))
+        doc_id = chunk_id(source, doc.page_content, model)
+        if doc_id in seen:
+            continue  # identical chunk repeated within a source
+        seen.add(doc_id)
+        current.setdefault(source, []).append(doc_id)
+        if doc_id not in known:
+            batch_docs.append(doc)
+            batch_ids.append(doc_id)
+            if len(batch_docs) >= batch_size:
+                flush()
+    flush()
+
+    stale_ids = sorted(known - seen)
+    if stale_ids:
+        vectorstore.delete(ids=stale_ids)
+    manifest.sources = current
+    if save_manifest:
+        manifest.save()
+    stats = IngestStats(added, len(stale_ids), len(seen) - added)
+    print(f"Ingest: {stats.added} new/changed chunks embedded, "
+          f"{stats.removed} removed, {stats.unchanged} unchanged")
+    return stats
@@ -0,0 +1,233 @@
+import json
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+# Local, in-process vector backend for Lab 1.3 (drop-in for PineconeVectorStore).
+#
+# Vectors live in one contiguous float32 matrix with L2-normalized rows, so
+# cosine similarity for a whole batch of queries is a single matrix multiply
+# followed by a partial sort. The matrix is persisted as a .npy file and
+# memory-mapped on load: a large index opens instantly and pages in on demand.
+
+class LocalVectorIndex:
+    """Cosine top-k search over a growable float32 matrix"""
+
+    def __init__(self, dim: Optional[int] = None, vectors: Optional[np.ndarray] = None):
+        self.dim = dim if vectors is None else vectors.shape[1]
+        self._vectors = vectors  # may be a read-only memmap until the first write
+        self.size = 0 if vectors is None else vectors.shape[0]
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """The live (size, dim) view of the matrix"""
+        if self._vectors is None:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        return self._vectors[:self.size]
+
+    @staticmethod
+    def normalize(vectors) -> np.ndarray:
+        matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix[None, :]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def add(self, vectors) -> range:
+        """Append vectors; returns their row numbers"""
+        matrix = self.normalize(vectors)
+        if self.dim is None:
+            self.dim = matrix.shape[1]
+        elif matrix.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-dimensional vectors, got {matrix.shape[1]}")
+        needed = self.size + matrix.shape[0]
+        capacity = 0 if self._vectors is None else self._vectors.shape[0]
+        if needed > capacity or not self._vectors.flags.writeable:
+            # Grow geometrically so repeated adds stay amortized O(n)
+            grown = np.empty((max(needed, 2 * capacity, 64), self.dim), dtype=np.float32)
+            grown[:self.size] = self.vectors
+            self._vectors = grown
+        self._vectors[self.size:needed] = matrix
+        start, self.size = self.size, needed
+        return range(start, needed)
+
+    def remove(self, rows: Iterable[int]):
+        """Delete rows; later rows shift down to keep the matrix contiguous"""
+        keep = np.ones(self.size, dtype=bool)
+        keep[list(rows)] = False
+        self._vectors = np.ascontiguousarray(self.vectors[keep])
+        self.size = self._vectors.shape[0]
+
+    def search(self, queries, k: int = 4) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k cosine search for a batch of queries.
+
+        Returns:
+            (scores, rows), both shaped (n_queries, min(k, size)), best first
+        """
+        queries = self.normalize(queries)
+        k = min(k, self.size)
+        if k == 0:
+            empty = np.empty((queries.shape[0], 0))
+            return empty.astype(np.float32), empty.astype(np.int64)
+        scores = queries @ self.vectors.T
+        if k < self.size:
+            rows = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            rows = np.broadcast_to(np.arange(self.size), scores.shape)
+        top = np.take_along_axis(scores, rows, axis=1)
+        order = np.argsort(-top, axis=1)
+        return np.take_along_axis(top, order, axis=1), np.take_along_axis(rows, order, axis=1)
+
+    def save(self, path: Path):
+        np.save(path, self.vectors)
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = True) -> "LocalVectorIndex":
+        return cls(vectors=np.load(path, mmap_mode="r" if mmap else None))
+
+class LocalVectorStore(VectorStore):
+    """
+    LangChain VectorStore over a LocalVectorIndex.
+
+    Works anywhere the lab uses PineconeVectorStore: as_retriever(),
+    MultiQueryRetriever, similarity_search(). Row i of the index belongs to
+    ids[i] / texts[i] / metadatas[i].
+    """
+
+    VECTORS_FILE = "vectors.npy"
+    DOCSTORE_FILE = "docstore.json"
+
+    def __init__(self, embedding: Embeddings, index: Optional[LocalVectorIndex] = None):
+        self._embedding = embedding
+        self.index = index or LocalVectorIndex()
+        self.ids: List[str] = []
+        self.texts: List[str] = []
+        self.metadatas: List[Dict] = []
+        self._rows: Dict[str, int] = {}
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # --- Writes ---
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[Dict]] = None,
+        *,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        vectors = self._embedding.embed_documents(texts) if texts else []
+        return self.add_vectors(texts, vectors, metadatas, ids)
+
+    def add_vectors(
+        self,
+        texts: List[str],
+        vectors: Sequence[Sequence[float]],
+        metadatas: Optional[List[Dict]] = None,
+        ids: Optional[List[str]] = None,
+    ) -> List[str]:
+        """Add pre-computed embeddings; existing ids are replaced"""
+        if not texts:
+            return []
+        ids = list(ids) if ids is not None else [str(uuid.uuid4()) for _ in texts]
+        replaced = [i for i in ids if i in self._rows]
+        if replaced:
+            self.delete(replaced)
+        self.index.add(vectors)
+        for doc_id in ids:
+            self._rows[doc_id] = len(self.ids)
+            self.ids.append(doc_id)
+        self.texts.extend(texts)
+        self.metadatas.extend(metadatas or [{} for _ in texts])
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if ids is None:
+            return False
+        rows = sorted({self._rows[i] for i in ids if i in self._rows})
+        if not rows:
+            return False
+        self.index.remove(rows)
+        dropped = set(rows)
+        self.ids = [v for r, v in enumerate(self.ids) if r not in dropped]
+        self.texts = [v for r, v in enumerate(self.texts) if r not in dropped]
+        self.metadatas = [v for r, v in enumerate(self.metadatas) if r not in dropped]
+        self._rows = {doc_id: row for row, doc_id in enumerate(self.ids)}
+        return True
+
+    # --- Search ---
+
+    def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
+        return [self._document(self._rows[i]) for i in ids if i in self._rows]
+
+    def similarity_search_by_vectors(self, vectors: Sequence[Sequence[float]], k: int = 4) -> List[List[Tuple[Document, float]]]:
+        """Search many query vectors with one matrix multiply"""
+        scores, rows = self.index.search(vectors, k)
+        return [
+            [(self._document(int(r)), float(s)) for s, r in zip(row_scores, row_ids)]
+            for row_scores, row_ids in zip(scores, rows)
+        ]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_by_vectors([self._embedding.embed_query(query)], k)[0]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vectors([embedding], k)[0]]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def _select_relevance_score_fn(self):
+        # Scores are cosine similarities in [-1, 1]; map to [0, 1]
+        return lambda score: (score + 1) / 2
+
+    def _document(self, row: int) -> Document:
+        return Document(page_content=self.texts[row], metadata=self.metadatas[row], id=self.ids[row])
+
+    # --- Persistence ---
+
+    def save(self, persist_dir: str):
+        path = Path(persist_dir)
+        path.mkdir(parents=True, exist_ok=True)
+        self.index.save(path / self.VECTORS_FILE)
+        with open(path / self.DOCSTORE_FILE, 'w', encoding='utf-8') as f:
+            json.dump({"ids": self.ids, "texts": self.texts, "metadatas": self.metadatas}, f)
+
+    @classmethod
+    def load(cls, persist_dir: str, embedding: Embeddings, mmap: bool = True) -> "LocalVectorStore":
+        """Open a saved store; vectors are memory-mapped unless mmap=False"""
+        path = Path(persist_dir)
+        store = cls(embedding, LocalVectorIndex.load(path / cls.VECTORS_FILE, mmap=mmap))
+        with open(path / cls.DOCSTORE_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        store.ids, store.texts, store.metadatas = data["ids"], data["texts"], data["metadatas"]
+        store._rows = {doc_id: row for row, doc_id in enumerate(store.ids)}
+        return store
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[Dict]] = None,
+        *,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> "LocalVectorStore":
+        store = cls(embedding)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
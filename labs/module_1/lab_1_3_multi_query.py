@@ -0,0 +1,105 @@
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.language_models import BaseLanguageModel
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import PromptTemplate
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.runnables import Runnable
+from langchain_core.vectorstores import VectorStore
+from pydantic import Field, PrivateAttr
+
+from lab_1_3_bm25 import reciprocal_rank_fusion
+
+# Parallel multi-query retrieval for Lab 1.3.
+#
+# MultiQueryRetriever runs one full retrieval (embedding call + vector search)
+# per generated variant, one after another. ParallelMultiQueryRetriever embeds
+# the question and all variants as queries at once (one cache lookup plus one
+# batched embedding call for the misses on CachedEmbeddings), runs the vector searches
+# concurrently (a single matrix multiply on LocalVectorStore), and merges the
+# results deduplicated by chunk id. Variants are cached per question, so a
+# repeated question skips the LLM call too.
+
+QUERY_VARIANTS_PROMPT = PromptTemplate.from_template(
+    """You are an AI language model assistant. Your task is
+    to generate 3 different versions of the given user
+    question to retrieve relevant documents from a vector  database.
+    By generating multiple perspectives on the user question,
+    your goal is to help the user overcome some of the limitations
+    of distance-based similarity search. Provide these alternative
+    questions separated by newlines. Original question: {question}"""
+)
+
+def _normalize_question(question: str) -> str:
+    return re.sub(r"\s+", " ", question.strip().lower())
+
+class ParallelMultiQueryRetriever(BaseRetriever):
+    """
+    Multi-query retrieval with one embedding round-trip and concurrent searches.
+
+    Use from_llm(vectorstore, llm); results are the union over the original
+    question and its variants, ranked by reciprocal rank fusion.
+    """
+
+    vectorstore: VectorStore
+    llm_chain: Runnable
+    k: int = 4
+    max_cached_questions: int = 1024
+    # question -> variants, LRU ordered; pass one in to share it between retrievers
+    variants_cache: Any = Field(default_factory=OrderedDict)
+
+    _cache_lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    @classmethod
+    def from_llm(cls, vectorstore: VectorStore, llm: BaseLanguageModel,
+                 prompt: PromptTemplate = QUERY_VARIANTS_PROMPT, **kwargs) -> "ParallelMultiQueryRetriever":
+        return cls(vectorstore=vectorstore, llm_chain=prompt | llm | StrOutputParser(), **kwargs)
+
+    def generate_queries(self, question: str, run_manager: CallbackManagerForRetrieverRun) -> List[str]:
+        """LLM-generated variants, cached per (normalized) question"""
+        key = _normalize_question(question)
+        with self._cache_lock:
+            if key in self.variants_cache:
+                self.variants_cache.move_to_end(key)
+                return self.variants_cache[key]
+        text = self.llm_chain.invoke({"question": question}, config={"callbacks": run_manager.get_child()})
+        variants = [line.strip() for line in text.strip().split("\n") if line.strip()]
+        with self._cache_lock:
+            self.variants_cache[key] = variants
+            while len(self.variants_cache) > self.max_cached_questions:
+                self.variants_cache.popitem(last=False)
+        return variants
+
+    def _embed_queries(self, queries: List[str]) -> List[List[float]]:
+        # Query-side embeddings (not embed_documents), which differ for asymmetric
+        # models; per-text embed_query is the fallback when there is no batch API
+        embeddings = self.vectorstore.embeddings
+        if hasattr(embeddings, "embed_queries"):
+            return embeddings.embed_queries(queries)
+        with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+            return list(pool.map(embeddings.embed_query, queries))
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        queries = [query] + [q for q in self.generate_queries(query, run_manager) if q != query]
+        run_manager.on_text(f"Generated queries: {queries[1:]}\n")
+        vectors = self._embed_queries(queries)
+
+        if hasattr(self.vectorstore, "similarity_search_by_vectors"):
+            result_lists = [
+                [doc for doc, _ in hits]
+                for hits in self.vectorstore.similarity_search_by_vectors(vectors, self.k)
+            ]
+        else:
+            with ThreadPoolExecutor(max_workers=len(vectors)) as pool:
+                result_lists = list(pool.map(
+                    lambda vector: self.vectorstore.similarity_search_by_vector(vector, k=self.k), vectors
+                ))
+        return reciprocal_rank_fusion(result_lists)
@@ -0,0 +1,128 @@
+import os
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+# Parallel load + split for Lab 1.3 ingestion.
+#
+# Each file is loaded and chunked in a worker process, so parsing and splitting
+# scale with the number of cores. Chunks flow back through a bounded queue to
+# the consumer (embedding/upsert via sync_vectorstore), which runs concurrently
+# with the workers; at most `max_pending` files are in flight and at most
+# `queue_size` chunks are buffered, so memory stays flat on a multi-GB archive.
+
+DEFAULT_PATTERNS = ("**/*.md", "**/*.txt", "**/*.json")
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+
+# One splitter per worker process and settings, built on first use
+_splitters: Dict[Tuple[int, int], object] = {}
+
+def discover_files(data_dir: str, patterns: Sequence[str] = DEFAULT_PATTERNS) -> List[Path]:
+    """Files matching the lab's loaders, skipping hidden paths such as data/.cache"""
+    root = Path(data_dir)
+    files = set()
+    for pattern in patterns:
+        for path in root.glob(pattern):
+            if path.is_file() and not any(part.startswith(".") for part in path.relative_to(root).parts):
+                files.add(path)
+    # Largest first, so one big file does not end up as the last task
+    return sorted(files, key=lambda p: p.stat().st_size, reverse=True)
+
+def load_and_split_file(path: str, chunk_size: int = CHUNK_SIZE,
+                        chunk_overlap: int = CHUNK_OVERLAP) -> List[Tuple[str, Dict]]:
+    """
+    Worker: load one file with the same loader as load_documents() and split it.
+    Returns (page_content, metadata) pairs, which pickle far faster than Documents.
+    """
+    from langchain_community.document_loaders import TextLoader, UnstructuredMarkdownLoader
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    splitter = _splitters.get((chunk_size, chunk_overlap))
+    if splitter is None:
+        splitter = _splitters[(chunk_size, chunk_overlap)] = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            add_start_index=True
+        )
+    loader = UnstructuredMarkdownLoader(path) if path.endswith(".md") else TextLoader(path)
+    return [(doc.page_content, doc.metadata) for doc in splitter.split_documents(loader.load())]
+
+def stream_chunks(
+    data_dir: str,
+    workers: Optional[int] = None,
+    max_pending: Optional[int] = None,
+    queue_size: int = 1024,
+    chunk_size: int = CHUNK_SIZE,
+    chunk_overlap: int = CHUNK_OVERLAP,
+) -> Iterator[Document]:
+    """
+    Yield chunks for every file under data_dir as worker processes finish them.
+
+    Args:
+        data_dir: Corpus root (same files as load_documents())
+        workers: Worker processes (default: CPU count)
+        max_pending: Files submitted but not yet collected (default: 2 x workers)
+        queue_size: Chunks buffered ahead of the consumer before workers' results wait
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+    files = discover_files(data_dir)
+    chunks: queue.Queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    done = object()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def collect(futures) -> bool:
+        for future in futures:
+            for page_content, metadata in future.result():
+                if not put(Document(page_content=page_content, metadata=metadata)):
+                    return False
+        return True
+
+    def produce():
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = set()
+                for path in files:
+                    pending.add(pool.submit(load_and_split_file, str(path), chunk_size, chunk_overlap))
+                    if len(pending) >= max_pending:
+                        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        if not collect(finished):
+                            break
+                while pending and not stop.is_set():
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    if not collect(finished):
+                        break
+                for future in pending:
+                    future.cancel()
+        except BaseException as e:
+            put(e)
+        finally:
+            put(done)
+
+    producer = threading.Thread(target=produce, name="chunk-producer", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = chunks.get()
+            if item is done:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        producer.join()
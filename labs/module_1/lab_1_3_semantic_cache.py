@@ -0,0 +1,154 @@
+import hashlib
+import re
+import threading
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Union
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.runnables import Runnable, RunnableLambda
+
+from lab_1_3_bm25 import control_ids
+from lab_1_3_local_index import LocalVectorStore
+
+# Semantic question -> answer cache for the Lab 1.3 RAG chain.
+#
+# A question is first looked up by its normalized text (no embedding call),
+# then by nearest neighbour over the embeddings of previously answered
+# questions, so "Explain GOVERN 1.1" and "Can you explain GOVERN 1.1?" share
+# one answer. Every entry is tagged with a fingerprint of the corpus chunks it
+# was answered from; when the corpus changes the fingerprint changes and the
+# old answers are dropped instead of being served stale. Pass the fingerprint
+# as a callable to have it re-checked on every lookup, e.g. against the ingest
+# manifest a later sync_vectorstore() updates.
+
+DEFAULT_SIMILARITY_THRESHOLD = 0.95
+
+def normalize_question(question: str) -> str:
+    return re.sub(r"\s+", " ", question.strip().lower()).rstrip("?!. ")
+
+def corpus_fingerprint(chunk_ids: Iterable[str]) -> str:
+    """Order-independent hash of a corpus' chunk ids (see lab_1_3_ingest.chunk_id)"""
+    digest = hashlib.sha256()
+    for chunk in sorted(set(chunk_ids)):
+        digest.update(chunk.encode("utf-8") + b"\n")
+    return digest.hexdigest()[:32]
+
+def _identifiers(question: str) -> frozenset:
+    # Control ids such as "GOVERN 1.1" or "AC-2": near-identical questions about
+    # different controls embed very close together, so these must match exactly
+    return control_ids(question)
+
+class SemanticCache:
+    """
+    Exact + nearest-neighbour answer cache, invalidated by corpus fingerprint.
+
+    Args:
+        embeddings: Embeddings for questions (wrap in CachedEmbeddings)
+        corpus: Fingerprint of the corpus answers are generated from, or a
+            callable returning the current one (checked on every lookup/update)
+        path: Directory to persist the cache in (None: in-memory only)
+        threshold: Minimum cosine similarity for a nearest-neighbour hit
+        max_entries: Oldest answers are evicted beyond this many
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        corpus: Union[str, Callable[[], str]],
+        path: Optional[str] = None,
+        threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+        max_entries: int = 10_000,
+    ):
+        self.path = path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if path and (Path(path) / LocalVectorStore.DOCSTORE_FILE).exists():
+            self.store = LocalVectorStore.load(path, embeddings, mmap=False)
+        else:
+            self.store = LocalVectorStore(embeddings)
+        self._corpus_source = corpus if callable(corpus) else None
+        self.corpus = None
+        self.set_corpus(corpus() if callable(corpus) else corpus)
+
+    def set_corpus(self, corpus: str):
+        """Switch to a new corpus fingerprint, dropping answers from any other"""
+        with self._lock:
+            self.corpus = corpus
+            stale = [doc_id for doc_id, meta in zip(self.store.ids, self.store.metadatas)
+                     if meta.get("corpus") != corpus]
+            if stale:
+                self.store.delete(stale)
+                print(f"Semantic cache: corpus changed, dropped {len(stale)} cached answers")
+
+    def _check_corpus(self):
+        if self._corpus_source is not None:
+            corpus = self._corpus_source()
+            if corpus != self.corpus:
+                self.set_corpus(corpus)
+
+    @staticmethod
+    def _key(question: str) -> str:
+        return hashlib.sha256(normalize_question(question).encode("utf-8")).hexdigest()[:32]
+
+    def lookup(self, question: str) -> Optional[str]:
+        """Cached answer for `question`, or None"""
+        self._check_corpus()
+        key = self._key(question)
+        with self._lock:
+            exact = self.store.get_by_ids([key])
+            if exact:
+                self.exact_hits += 1
+                return exact[0].metadata["answer"]
+            if not len(self.store):
+                self.misses += 1
+                return None
+
+        vector = self.store.embeddings.embed_query(normalize_question(question))
+        identifiers = _identifiers(question)
+        with self._lock:
+            for doc, score in self.store.similarity_search_by_vectors([vector], k=4)[0]:
+                if score < self.threshold:
+                    break
+                if _identifiers(doc.page_content) == identifiers:
+                    self.semantic_hits += 1
+                    return doc.metadata["answer"]
+            self.misses += 1
+        return None
+
+    def update(self, question: str, answer: str):
+        self._check_corpus()
+        normalized = normalize_question(question)
+        vector = self.store.embeddings.embed_query(normalized)
+        with self._lock:
+            self.store.add_vectors(
+                [normalized], [vector],
+                [{"answer": answer, "corpus": self.corpus}],
+                ids=[self._key(question)],
+            )
+            overflow = len(self.store) - self.max_entries
+            if overflow > 0:
+                self.store.delete(self.store.ids[:overflow])
+
+    def wrap(self, chain: Runnable) -> Runnable:
+        """
+        A Runnable that answers from the cache and falls back to `chain`
+        (question in, answer string out) on a miss.
+        """
+        def answer(question: str) -> str:
+            cached = self.lookup(question)
+            if cached is not None:
+                return cached
+            response = chain.invoke(question)
+            self.update(question, response)
+            return response
+
+        return RunnableLambda(answer, name="SemanticCache")
+
+    def save(self):
+        if self.path:
+            with self._lock:
+                self.store.save(self.path)
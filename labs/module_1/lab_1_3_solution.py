@@ -1,6 +1,6 @@
 import os
 import time
-from typing import List
+from typing import Iterable, List, Optional
 from langchain_community.document_loaders import DirectoryLoader, TextLoader, UnstructuredMarkdownLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
@@ -9,9 +9,34 @@ from langchain.retrievers.multi_query import MultiQueryRetriever
 from langchain_core.documents import Document
 from pinecone import Pinecone, ServerlessSpec
 
+from lab_1_3_bm25 import BM25Builder, BM25Index, HybridRetriever
+from lab_1_3_embedding_cache import CachedEmbeddings
+from lab_1_3_ingest import IngestManifest, sync_vectorstore
+from lab_1_3_local_index import LocalVectorStore
+from lab_1_3_multi_query import ParallelMultiQueryRetriever
+from lab_1_3_pipeline import stream_chunks
+
 # --- Configuration ---
 INDEX_NAME = "agent-judge-lab-1-3"
 DATA_DIR = "../../data"
+# "pinecone" (managed index) or "local" (in-process NumPy index, persisted under LOCAL_INDEX_DIR)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "pinecone")
+# "parallel" (batched embeddings, concurrent searches, cached variants) or "classic" (MultiQueryRetriever)
+MULTI_QUERY_MODE = os.getenv("MULTI_QUERY_MODE", "parallel")
+# Processes used to load and split files (see lab_1_3_pipeline.py)
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", os.cpu_count() or 1))
+LOCAL_INDEX_DIR = os.path.join(DATA_DIR, ".cache", "lab_1_3_index")
+# Chunk ids already upserted to the Pinecone index (see lab_1_3_ingest.py)
+PINECONE_MANIFEST_PATH = os.path.join(DATA_DIR, ".cache", f"ingest_manifest_{INDEX_NAME}.json")
+
+_embeddings = None
+
+def get_embeddings() -> CachedEmbeddings:
+    """One shared OpenAIEmbeddings client behind the disk + LRU embedding cache"""
+    global _embeddings
+    if _embeddings is None:
+        _embeddings = CachedEmbeddings(OpenAIEmbeddings())
+    return _embeddings
 
 def load_documents() -> List[Document]:
     print("--- Loading Documents ---")
@@ -42,10 +67,16 @@ def split_documents(docs: List[Document]) -> List[Document]:
     print(f"Created {len(splits)} chunks.")
     return splits
 
-def setup_vectorstore(splits: List[Document]):
-    print("--- Setting up VectorStore ---")
+def setup_vectorstore(splits: Iterable[Document], backend: str = VECTOR_BACKEND):
+    print(f"--- Setting up VectorStore ({backend}) ---")
+    if backend == "local":
+        return setup_local_vectorstore(splits)
+    if backend != "pinecone":
+        raise ValueError(f"Unknown VECTOR_BACKEND '{backend}' (use 'pinecone' or 'local')")
+
     pc = Pinecone()
     
+    manifest = IngestManifest(PINECONE_MANIFEST_PATH)
     existing_indexes = [i.name for i in pc.list_indexes()]
     if INDEX_NAME not in existing_indexes:
         print(f"Creating index {INDEX_NAME}...")
@@ -56,16 +87,35 @@ def setup_vectorstore(splits: List[Document]):
             spec=ServerlessSpec(cloud="aws", region="us-east-1")
         )
         time.sleep(10)
+        manifest.sources = {}  # fresh index: nothing has been upserted yet
 
-    embeddings = OpenAIEmbeddings()
-    vectorstore = PineconeVectorStore.from_documents(
-        documents=splits,
-        embedding=embeddings,
-        index_name=INDEX_NAME
-    )
+    embeddings = get_embeddings()
+    vectorstore = PineconeVectorStore(index_name=INDEX_NAME, embedding=embeddings)
+    # Only new/changed chunks are embedded and upserted; removed ones are deleted
+    sync_vectorstore(vectorstore, splits, manifest)
     return vectorstore
 
-def run_queries(vectorstore):
+def setup_local_vectorstore(splits: Iterable[Document], persist_dir: str = LOCAL_INDEX_DIR):
+    """
+    Load the saved LocalVectorStore (if any), sync it with the chunks and save it.
+    The manifest lives next to the vectors and is written (atomically) only after
+    them, so it never lists chunks that are missing from the saved vectors.
+    """
+    embeddings = get_embeddings()
+    manifest = IngestManifest(os.path.join(persist_dir, "ingest_manifest.json"))
+    if os.path.exists(os.path.join(persist_dir, LocalVectorStore.DOCSTORE_FILE)):
+        vectorstore = LocalVectorStore.load(persist_dir, embeddings)
+    else:
+        vectorstore = LocalVectorStore(embeddings)
+        manifest.sources = {}
+    stats = sync_vectorstore(vectorstore, splits, manifest, save_manifest=False)
+    if stats.added or stats.removed:
+        vectorstore.save(persist_dir)
+        print(f"Saved {len(vectorstore)} vectors to {persist_dir}")
+    manifest.save()
+    return vectorstore
+
+def run_queries(vectorstore, bm25: Optional[BM25Index] = None):
     llm = ChatOpenAI(temperature=0)
     
     # 1. Basic Retrieval
@@ -76,12 +126,30 @@ def run_queries(vectorstore):
     for i, doc in enumerate(docs):
         print(f"Result {i+1}: {doc.page_content[:100]}... (Source: {doc.metadata.get('source')})")
 
-    # 2. Multi-Query Retrieval
-    print("\n--- Multi-Query Retrieval ---")
-    mq_retriever = MultiQueryRetriever.from_llm(
-        retriever=vectorstore.as_retriever(),
-        llm=llm
-    )
+    # 2. Hybrid Retrieval (BM25 + vector, fused with reciprocal rank fusion)
+    if bm25 is not None:
+        print("\n--- Hybrid Retrieval (BM25 + Vector) ---")
+        hybrid = HybridRetriever(
+            bm25=bm25,
+            vector_retriever=vectorstore.as_retriever(search_kwargs={"k": 20}),
+            k=2
+        )
+        for query in ["GOVERN 1.1", "Who approves high-risk AI models under GOVERN 1.1?"]:
+            start = time.perf_counter()
+            docs = hybrid.invoke(query)
+            print(f"Query: {query} ({(time.perf_counter() - start) * 1000:.2f} ms)")
+            for i, doc in enumerate(docs):
+                print(f"Result {i+1}: {doc.page_content[:100]}... (Source: {doc.metadata.get('source')})")
+
+    # 3. Multi-Query Retrieval
+    print(f"\n--- Multi-Query Retrieval ({MULTI_QUERY_MODE}) ---")
+    if MULTI_QUERY_MODE == "parallel":
+        mq_retriever = ParallelMultiQueryRetriever.from_llm(vectorstore=vectorstore, llm=llm)
+    else:
+        mq_retriever = MultiQueryRetriever.from_llm(
+            retriever=vectorstore.as_retriever(),
+            llm=llm
+        )
     complex_query = "Compare the NIST GOVERN requirements with our internal policy on PII."
     
     # Enable logging to see the generated queries
@@ -95,8 +163,10 @@ def run_queries(vectorstore):
         print(f"Result {i+1}: {doc.page_content[:100]}... (Source: {doc.metadata.get('source')})")
 
 if __name__ == "__main__":
-    docs = load_documents()
-    if docs:
-        splits = split_documents(docs)
-        vectorstore = setup_vectorstore(splits)
-        run_queries(vectorstore)
+    # Load and split files across a process pool, streaming chunks straight into
+    # embedding/upsert (load_documents() + split_documents() is the sequential version)
+    print(f"--- Loading and Splitting Documents ({INGEST_WORKERS} workers) ---")
+    # The same chunks are indexed for BM25 (hybrid retrieval) as they pass through
+    bm25 = BM25Builder()
+    vectorstore = setup_vectorstore(bm25.feed(stream_chunks(DATA_DIR, workers=INGEST_WORKERS)))
+    run_queries(vectorstore, bm25.build())
@@ -0,0 +1,31 @@
+import asyncio
+
+import pytest
+
+from lab_1_2_gateway import GatewayStopped, MockDownstreamModel, PIIGateway
+
+# Shutdown tests for the Lab 1.2 PII gateway: every request accepted before
+# stop() must be answered, either with a result or with GatewayStopped.
+# Run from labs/module_1: python -m pytest -q
+
+def test_stop_while_batch_is_filling():
+    async def run():
+        gateway = PIIGateway(workers=1, max_batch_size=32, max_batch_delay=5.0)
+        request = asyncio.create_task(gateway.submit("hello"))
+        await asyncio.sleep(0.1)  # the worker holds the request, waiting for more
+        await gateway.stop()
+        with pytest.raises(GatewayStopped):
+            await asyncio.wait_for(request, timeout=1.0)
+
+    asyncio.run(run())
+
+def test_stop_fails_queued_and_in_flight_requests():
+    async def run():
+        gateway = PIIGateway(downstream=MockDownstreamModel(latency=5.0), workers=1, max_batch_size=2)
+        requests = [asyncio.create_task(gateway.submit(f"message {i}")) for i in range(5)]
+        await asyncio.sleep(0.1)
+        await gateway.stop()
+        results = await asyncio.wait_for(asyncio.gather(*requests, return_exceptions=True), timeout=1.0)
+        assert all(isinstance(result, GatewayStopped) for result in results)
+
+    asyncio.run(run())
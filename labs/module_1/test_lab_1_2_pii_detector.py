@@ -0,0 +1,27 @@
+from lab_1_2_pii_detector import DEFAULT_DETECTOR, detect_pii
+
+# Regression tests for the Lab 1.2 PII detector: a candidate that fails
+# validation must not hide valid PII inside or right after it.
+# Run from labs/module_1: python -m pytest -q
+
+def _found(text):
+    return [(m.pii_type, m.text) for m in detect_pii(text)]
+
+def test_card_followed_by_ssn():
+    assert _found("card 4111 1111 1111 1111 123-45-6789") == [
+        ("CREDIT_CARD", "4111 1111 1111 1111"),
+        ("SSN", "123-45-6789"),
+    ]
+
+def test_card_followed_by_digit_group():
+    assert _found("4111 1111 1111 1111 20") == [("CREDIT_CARD", "4111 1111 1111 1111")]
+
+def test_bare_nine_digits_need_ssn_label():
+    assert _found("order 123456789 shipped") == []
+    assert ("SSN", "123456789") in _found("SSN: 123456789")
+
+def test_stream_scan_matches_scan():
+    text = "x " * 40_000 + "card 4111 1111 1111 1111 123-45-6789"
+    expected = DEFAULT_DETECTOR.scan(text)
+    assert list(DEFAULT_DETECTOR.scan_stream(text, chunk_size=1000)) == expected
+    assert list(DEFAULT_DETECTOR.scan_stream(text.encode(), chunk_size=1000)) == expected
@@ -0,0 +1,30 @@
+from langchain_core.messages import HumanMessage
+
+from lab_1_2_solution import build_graph, route_messages
+
+# Routing tests for the Lab 1.2 PII Router: PII values are redacted, while a
+# message that only mentions a PII keyword passes through unchanged.
+# Run from labs/module_1: python -m pytest -q
+
+QUIET = {"configurable": {"verbose": False}}
+
+def _run(text):
+    return build_graph().invoke({"messages": [HumanMessage(content=text)]}, QUIET)
+
+def test_keyword_only_message_is_not_redacted():
+    text = "Is a Credit Card number covered by the policy?"
+    state = _run(text)
+    assert not state["pii_detected"]
+    assert state["messages"][0].content == text
+    assert [span["pii_type"] for span in state["pii_matches"]] == ["KEYWORD"]
+
+def test_value_is_redacted_and_keyword_kept():
+    state = _run("My SSN is 123-45-6789.")
+    assert state["pii_detected"]
+    assert state["messages"][0].content == "My SSN is ***-**-****."
+
+def test_route_messages_matches_graph():
+    results = list(route_messages(["Is a Credit Card number covered?", "Card 4111 1111 1111 1111"]))
+    assert [r["route"] for r in results] == ["process", "redact"]
+    assert results[0]["messages"][0].content == "Is a Credit Card number covered?"
+    assert results[1]["messages"][0].content == "Card **** **** **** ****"
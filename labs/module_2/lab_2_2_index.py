@@ -0,0 +1,73 @@
+import json
+from pathlib import Path
+from typing import List, Sequence
+
+from llama_index.core import (
+    Settings,
+    SimpleDirectoryReader,
+    StorageContext,
+    VectorStoreIndex,
+    load_index_from_storage,
+)
+from llama_index.core.schema import Document
+
+# Persisted LlamaIndex index for Lab 2.2.
+#
+# The index (docstore, vector store, index store) is written to a storage
+# directory once and reloaded on startup instead of re-embedding the corpus.
+# Documents are keyed by file path and LlamaIndex keeps a content hash for
+# each, so refresh_ref_docs() re-embeds only documents whose text changed;
+# documents whose files are gone are deleted from the index.
+
+STORAGE_DIR = "../../data/.cache/lab_2_2_storage"
+# Written next to the index; a different embedding model means a full rebuild
+INDEX_INFO_FILE = "lab_2_2_index.json"
+
+def load_documents(input_files: Sequence[str]) -> List[Document]:
+    """Load files with their path as doc id, so re-runs map onto the same ref docs"""
+    return SimpleDirectoryReader(input_files=list(input_files), filename_as_id=True).load_data()
+
+def _embed_model_name() -> str:
+    embed_model = Settings.embed_model
+    return str(getattr(embed_model, "model_name", None) or type(embed_model).__name__)
+
+def _persist(index: VectorStoreIndex, persist_dir: Path):
+    index.storage_context.persist(persist_dir=str(persist_dir))
+    with open(persist_dir / INDEX_INFO_FILE, 'w') as f:
+        json.dump({"embed_model": _embed_model_name()}, f)
+
+def load_or_build_index(documents: Sequence[Document], persist_dir: str = STORAGE_DIR) -> VectorStoreIndex:
+    """
+    Load the persisted index and bring it in line with `documents`, or build
+    and persist it if there is none (or it was built with another embed model).
+
+    Args:
+        documents: Current documents, from load_documents()
+        persist_dir: Storage directory for the index
+    """
+    path = Path(persist_dir)
+    info_path = path / INDEX_INFO_FILE
+    if info_path.exists():
+        with open(info_path, 'r') as f:
+            info = json.load(f)
+        if info.get("embed_model") == _embed_model_name():
+            index = load_index_from_storage(StorageContext.from_defaults(persist_dir=str(path)))
+            refreshed = index.refresh_ref_docs(list(documents))
+            current = {doc.doc_id for doc in documents}
+            stale = [ref_id for ref_id in index.ref_doc_info if ref_id not in current]
+            for ref_id in stale:
+                index.delete_ref_doc(ref_id, delete_from_docstore=True)
+            changed = sum(refreshed)
+            print(f"Loaded index from {persist_dir}: {changed} changed documents re-embedded, "
+                  f"{len(stale)} removed, {len(refreshed) - changed} unchanged")
+            if changed or stale:
+                _persist(index, path)
+            return index
+        print("Embedding model changed, rebuilding index...")
+
+    print("Creating VectorStoreIndex...")
+    index = VectorStoreIndex.from_documents(list(documents))
+    path.mkdir(parents=True, exist_ok=True)
+    _persist(index, path)
+    print(f"Persisted index to {persist_dir}")
+    return index
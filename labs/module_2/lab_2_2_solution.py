@@ -1,13 +1,24 @@
+import asyncio
 import os
-from llama_index.core import VectorStoreIndex, SimpleDirectoryReader, Settings
+from llama_index.core import Settings
 from llama_index.llms.openai import OpenAI
 
+from lab_2_2_index import load_documents, load_or_build_index
+from lab_2_2_streaming import print_latency_report, stream_answer, stream_answers
+
 # Set global settings
 Settings.llm = OpenAI(model="gpt-4o", temperature=0)
 
+QUERIES = [
+    "What are the primary outcomes of the GOVERN function?",
+    "What does GOVERN 1.1 require organizations to maintain?",
+    "Which characteristics of trustworthy AI does GOVERN 1.2 list?",
+    "What does MAP 1.1 say about the deployment context?",
+]
+
 def run_lab_2_2():
     print("### Lab 2.2: LlamaIndex RAG (Solution) ###")
-    
+
     data_path = "../../data/nist_rmf_gov.md"
     if not os.path.exists(data_path):
         print(f"Error: Data file not found at {data_path}")
@@ -15,19 +26,31 @@ def run_lab_2_2():
 
     # --- Step 1: Load Data ---
     print(f"Loading data from {data_path}...")
-    documents = SimpleDirectoryReader(input_files=[data_path]).load_data()
+    documents = load_documents([data_path])
     print(f"Loaded {len(documents)} documents.")
-    
-    # --- Step 2: Create Index ---
-    print("Creating VectorStoreIndex...")
-    index = VectorStoreIndex.from_documents(documents)
-    
+
+    # --- Step 2: Load (or Create) Index ---
+    # Persisted under data/.cache; only changed documents are re-embedded
+    index = load_or_build_index(documents)
+
     # --- Step 3: Query ---
-    print("Querying: 'What are the primary outcomes of the GOVERN function?'")
-    query_engine = index.as_query_engine()
-    response = query_engine.query("What are the primary outcomes of the GOVERN function?")
-    
-    print(f"\nResponse:\n{response}")
+    # One streaming query engine, built once, serves every question
+    query_engine = index.as_query_engine(streaming=True)
+    asyncio.run(answer_questions(query_engine))
+
+async def answer_questions(query_engine):
+    # Tokens are printed as they arrive
+    print(f"Querying: '{QUERIES[0]}'\n\nResponse:")
+    first = await stream_answer(query_engine, QUERIES[0], lambda token: print(token, end="", flush=True))
+    print("\n")
+
+    # The remaining questions run concurrently over the same index
+    print(f"Answering {len(QUERIES) - 1} more questions concurrently...")
+    results = await stream_answers(query_engine, QUERIES[1:])
+    for result in results:
+        print(f"\nQ: {result.question}\nA: {result.answer}")
+    print()
+    print_latency_report([first] + results)
 
 if __name__ == "__main__":
     run_lab_2_2()
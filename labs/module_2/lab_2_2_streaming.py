@@ -0,0 +1,69 @@
+import asyncio
+import time
+from typing import Callable, List, NamedTuple, Optional, Sequence
+
+from llama_index.core.base.base_query_engine import BaseQueryEngine
+
+# Streaming, concurrent querying for Lab 2.2.
+#
+# A query engine built with as_query_engine(streaming=True) returns from
+# aquery() as soon as retrieval is done, with an async generator over the LLM
+# tokens. stream_answers() runs many questions at once over one shared engine
+# (and so one loaded index), hands each token to a callback as it arrives, and
+# records time-to-first-token, which is what an interactive user waits for.
+
+TokenCallback = Callable[[int, str], None]
+
+class StreamedAnswer(NamedTuple):
+    question: str
+    answer: str
+    first_token_s: Optional[float]  # None if the model produced no tokens
+    total_s: float
+
+async def stream_answer(
+    query_engine: BaseQueryEngine,
+    question: str,
+    on_token: Optional[Callable[[str], None]] = None,
+) -> StreamedAnswer:
+    """Ask one question on a streaming query engine, passing tokens to on_token"""
+    start = time.perf_counter()
+    first_token_s = None
+    tokens: List[str] = []
+    response = await query_engine.aquery(question)
+    async for token in response.async_response_gen():
+        if first_token_s is None:
+            first_token_s = time.perf_counter() - start
+        tokens.append(token)
+        if on_token is not None:
+            on_token(token)
+    return StreamedAnswer(question, "".join(tokens), first_token_s, time.perf_counter() - start)
+
+async def stream_answers(
+    query_engine: BaseQueryEngine,
+    questions: Sequence[str],
+    max_concurrency: int = 8,
+    on_token: Optional[TokenCallback] = None,
+) -> List[StreamedAnswer]:
+    """
+    Answer `questions` concurrently over one streaming query engine.
+
+    Args:
+        query_engine: From index.as_query_engine(streaming=True)
+        questions: Questions to ask; results come back in the same order
+        max_concurrency: Questions in flight at once (bounds LLM rate-limit pressure)
+        on_token: Called as on_token(question_index, token) for every token
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def ask(i: int, question: str) -> StreamedAnswer:
+        async with semaphore:
+            callback = (lambda token: on_token(i, token)) if on_token else None
+            return await stream_answer(query_engine, question, callback)
+
+    return await asyncio.gather(*(ask(i, q) for i, q in enumerate(questions)))
+
+def print_latency_report(results: Sequence[StreamedAnswer]):
+    print(f"{'TTFT':>8} {'Total':>8}  Question")
+    for result in results:
+        ttft = f"{result.first_token_s * 1000:.0f}ms" if result.first_token_s is not None else "-"
+        print(f"{ttft:>8} {result.total_s * 1000:>6.0f}ms  {result.question}")
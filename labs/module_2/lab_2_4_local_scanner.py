@@ -1,15 +1,27 @@
+import asyncio
+import contextlib
+import hashlib
 import json
 import os
+import random
+import threading
 from pathlib import Path
-from typing import List, Dict
+from typing import AsyncIterator, Awaitable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import httpx
 from dotenv import load_dotenv
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
+from lab_2_4_report_cache import ReportCache, report_cache_key
+from lab_2_4_rules import RuleEvaluation, evaluate_rules
+from lab_2_4_sinks import ReportSink
+from lab_2_4_prompt_cache import PREFIX_CACHE_STATS, PromptLayout, track_prefix_cache
 
 # Load environment variables
 load_dotenv()
 
+TARGET_DIR = Path("data/target_systems")
+DEFAULT_MANIFEST_PATH = "data/.cache/scan_manifest.json"
+
 # Reuse the ComplianceReport from Lab 2.1
 class ComplianceReport(BaseModel):
     """Structured compliance assessment report"""
@@ -25,8 +37,7 @@ class ComplianceReport(BaseModel):
 
 def load_target_system(filename: str) -> Dict:
     """Load a target system configuration from JSON"""
-    target_dir = Path("data/target_systems")
-    filepath = target_dir / filename
+    filepath = TARGET_DIR / filename
     
     if not filepath.exists():
         raise FileNotFoundError(f"System config not found: {filepath}")
@@ -58,27 +69,10 @@ def format_system_for_analysis(system_config: Dict) -> str:
     
     return "\n".join(lines)
 
-def analyze_system(system_filename: str, policy_name: str = "Security Baseline") -> ComplianceReport:
-    """
-    Analyze a target system against security policies
-    
-    Args:
-        system_filename: Name of JSON file in data/target_systems/
-        policy_name: Name of the policy framework to assess against
-        
-    Returns:
-        ComplianceReport with structured findings
-    """
-    print(f"\n{'='*70}")
-    print(f"Analyzing: {system_filename}")
-    print(f"{'='*70}\n")
-    
-    # Load system configuration
-    system_config = load_target_system(system_filename)
-    system_description = format_system_for_analysis(system_config)
-    
-    # Define security policy (you can load this from a file too)
-    security_policy = """
+DEFAULT_MODEL = "gpt-4o-mini"
+
+# Security policy the systems are assessed against (you can load this from a file too)
+SECURITY_POLICY = """
     SECURITY BASELINE REQUIREMENTS:
     
     1. ENCRYPTION:
@@ -124,13 +118,8 @@ def analyze_system(system_filename: str, policy_name: str = "Security Baseline")
        - RTO must be 8 hours or less
        - RPO must be 4 hours or less
     """
-    
-    # Create LLM chain with structured output
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-    structured_llm = llm.with_structured_output(ComplianceReport)
-    
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", """You are a senior security auditor conducting a compliance assessment.
+
+AUDITOR_INSTRUCTIONS = """You are a senior security auditor conducting a compliance assessment.
 
 Analyze the system configuration against the security policy requirements.
 Categorize findings by severity: CRITICAL, HIGH, MEDIUM, LOW.
@@ -140,25 +129,281 @@ HIGH: Significant security gap that should be addressed urgently
 MEDIUM: Security improvement needed but not urgent
 LOW: Best practice recommendation or minor issue
 
-Be thorough and specific. For each finding, explain what's wrong and why it matters."""),
-        ("user", """Security Policy:
-{policy}
+Be thorough and specific. For each finding, explain what's wrong and why it matters."""
 
-System Configuration:
+# Static prefix shared by the single and batched prompts: instructions + policy.
+# Only the system text after it changes per request, so the provider can reuse
+# its cached prefix (see lab_2_4_prompt_cache).
+ANALYSIS_PREFIX = f"""{AUDITOR_INSTRUCTIONS}
+
+Security Policy:
+{SECURITY_POLICY}"""
+
+ANALYSIS_LAYOUT = PromptLayout("compliance-analysis", ANALYSIS_PREFIX, """System Configuration:
 {system}
 
 Provide a detailed compliance assessment.""")
-    ])
+
+ANALYSIS_PROMPT = ANALYSIS_LAYOUT.template
+
+# Batched variant: several systems share one copy of the policy in a single request
+class BatchComplianceReport(BaseModel):
+    """One ComplianceReport per system in a batched request"""
+    reports: List[ComplianceReport] = Field(description="One report per system, in the order the systems were given")
+
+BATCH_ANALYSIS_LAYOUT = PromptLayout("compliance-analysis", ANALYSIS_PREFIX, """The following {count} system configurations are each introduced by a "### SYSTEM <n>" header.
+Assess every system independently against the policy and return exactly one report per system,
+in the same order, using each system's exact name as system_name.
+
+{systems}
+
+Provide a detailed compliance assessment for each system.""")
+
+BATCH_ANALYSIS_PROMPT = BATCH_ANALYSIS_LAYOUT.template
+
+# Rendered template text, part of the cache key so prompt edits invalidate cached reports
+PROMPT_TEMPLATE_TEXT = ANALYSIS_PROMPT.pretty_repr()
+# Reports from batched requests are cached under the batch prompt, apart from single-system ones
+BATCH_PROMPT_TEMPLATE_TEXT = BATCH_ANALYSIS_PROMPT.pretty_repr()
+
+def build_analysis_chain(model: str = DEFAULT_MODEL, llm: Optional[ChatOpenAI] = None):
+    """Create the prompt -> structured LLM chain used for compliance analysis"""
+    llm = llm or ChatOpenAI(model=model, temperature=0, **ANALYSIS_LAYOUT.cache_hints())
+    structured_llm = llm.with_structured_output(ComplianceReport, include_raw=True)
+    return ANALYSIS_PROMPT | structured_llm | track_prefix_cache()
+
+def build_batch_analysis_chain(model: str = DEFAULT_MODEL, llm: Optional[ChatOpenAI] = None):
+    """Create the chain that assesses several systems in one structured-output request"""
+    llm = llm or ChatOpenAI(model=model, temperature=0, **BATCH_ANALYSIS_LAYOUT.cache_hints())
+    structured_llm = llm.with_structured_output(BatchComplianceReport, include_raw=True)
+    return BATCH_ANALYSIS_PROMPT | structured_llm | track_prefix_cache()
+
+class ComplianceScanner:
+    """
+    Reusable compliance analyzer
     
-    chain = prompt | structured_llm
+    Builds the LLM client, the structured-output wrappers and the chains once
+    and keeps a pooled keep-alive HTTP client, so analyzing many systems does not
+    pay for client setup, schema conversion or a TLS handshake per system.
     
-    # Run analysis
-    result = chain.invoke({
-        "policy": security_policy,
-        "system": system_description
-    })
+    Example:
+        with ComplianceScanner(use_rules=True) as scanner:
+            report = scanner.analyze(load_target_system("api_vulnerable.json"))
+    """
     
-    # Display results
+    def __init__(
+        self,
+        model: str = DEFAULT_MODEL,
+        policy_name: str = "Security Baseline",
+        cache: Optional[ReportCache] = None,
+        use_rules: bool = False,
+        max_connections: int = 64,
+        request_timeout: float = 120.0,
+    ):
+        self.model = model
+        self.policy_name = policy_name
+        self.cache = cache
+        self.use_rules = use_rules
+        self._limits = httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_connections
+        )
+        self._request_timeout = request_timeout
+        self.http_client = httpx.Client(limits=self._limits, timeout=request_timeout)
+        llm = ChatOpenAI(
+            model=model, temperature=0, http_client=self.http_client,
+            **ANALYSIS_LAYOUT.cache_hints(),
+        )
+        self.chain = build_analysis_chain(model, llm)
+        self.batch_chain = build_batch_analysis_chain(model, llm)
+        # event loop -> (async client, chain, task that closes the client)
+        self._async_clients: Dict[asyncio.AbstractEventLoop, Tuple[httpx.AsyncClient, object, asyncio.Task]] = {}
+    
+    def async_chain(self):
+        """
+        Chain for ainvoke, backed by a pooled async HTTP client
+        
+        httpx async connections belong to the event loop that opened them, so
+        there is one async client and chain per event loop. Each client is
+        closed inside its own loop by aclose()/close() or, at the latest, when
+        asyncio.run() shuts that loop down.
+        """
+        loop = asyncio.get_running_loop()
+        entry = self._async_clients.get(loop)
+        if entry is None:
+            # Clients of finished loops were closed on shutdown; drop the references
+            for old_loop in [l for l in self._async_clients if l.is_closed()]:
+                del self._async_clients[old_loop]
+            client = httpx.AsyncClient(limits=self._limits, timeout=self._request_timeout)
+            llm = ChatOpenAI(
+                model=self.model, temperature=0, http_async_client=client,
+                **ANALYSIS_LAYOUT.cache_hints(),
+            )
+            closer = loop.create_task(_close_when_cancelled(client))
+            entry = self._async_clients[loop] = (client, build_analysis_chain(self.model, llm), closer)
+        return entry[1]
+    
+    def analyze(self, system_config: Dict, quiet: bool = True) -> ComplianceReport:
+        """Analyze one parsed system configuration"""
+        return analyze_system_config(
+            system_config, self.policy_name, self.cache, self.use_rules, quiet, scanner=self
+        )
+    
+    async def aanalyze(self, system_config: Dict, timeout: float = 120.0,
+                       max_retries: int = 3, backoff: float = 1.0) -> ComplianceReport:
+        """Async version of analyze (no console output), with the fleet scan's timeout and retries"""
+        prepared = prepare_analysis(system_config, self.model, self.cache, self.use_rules, self.policy_name)
+        if prepared.report is not None:
+            return prepared.report
+        result = await _analyze_with_retry(
+            self.async_chain(), prepared.description, None, timeout, max_retries, backoff
+        )
+        return finish_analysis(prepared, result, self.cache)
+    
+    async def aclose(self):
+        """Close the async client of the running event loop"""
+        entry = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            closer = entry[2]
+            closer.cancel()
+            await asyncio.gather(closer, return_exceptions=True)
+    
+    def close(self):
+        """Close the sync client and every async client whose loop is still open"""
+        self.http_client.close()
+        for loop, (_, _, closer) in list(self._async_clients.items()):
+            if loop.is_closed():
+                continue
+            closer.cancel()
+            if not loop.is_running():
+                loop.run_until_complete(asyncio.gather(closer, return_exceptions=True))
+        self._async_clients.clear()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+async def _close_when_cancelled(client: httpx.AsyncClient):
+    """Wait until cancelled (aclose/close, or asyncio.run() finishing), then close client"""
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await client.aclose()
+
+_default_scanners: Dict[str, ComplianceScanner] = {}
+_default_scanners_lock = threading.Lock()
+
+def get_default_scanner(model: str = DEFAULT_MODEL) -> ComplianceScanner:
+    """Process-wide ComplianceScanner per model, shared by the module-level scan functions"""
+    with _default_scanners_lock:
+        if model not in _default_scanners:
+            _default_scanners[model] = ComplianceScanner(model)
+        return _default_scanners[model]
+
+def analysis_cache_key(
+    system_description: str,
+    model: str = DEFAULT_MODEL,
+    policy_name: str = "Security Baseline",
+    batched: bool = False,
+) -> str:
+    """ReportCache key for an analysis; batched=True for reports from the batched prompt"""
+    template = BATCH_PROMPT_TEMPLATE_TEXT if batched else PROMPT_TEMPLATE_TEXT
+    return report_cache_key(SECURITY_POLICY, policy_name, system_description, model, template)
+
+def get_cached_report(
+    cache: Optional[ReportCache],
+    system_description: str,
+    model: str = DEFAULT_MODEL,
+    policy_name: str = "Security Baseline",
+    batched: bool = False,
+) -> Tuple[Optional[str], Optional[ComplianceReport]]:
+    """Look up a previous assessment of this exact policy/system/model/prompt combination"""
+    if cache is None:
+        return None, None
+    key = analysis_cache_key(system_description, model, policy_name, batched)
+    cached = cache.get(key)
+    if cached is None:
+        return key, None
+    try:
+        return key, ComplianceReport.model_validate(cached)
+    except ValidationError:
+        # Stored under an older ComplianceReport schema; treat as a miss
+        return key, None
+
+def prepare_system_description(
+    system_config: Dict, use_rules: bool = False
+) -> Tuple[str, Optional[RuleEvaluation]]:
+    """
+    Format a system for the LLM, optionally after the deterministic rule pre-pass
+    
+    With use_rules, every control decided by lab_2_4_rules is removed from the
+    description and replaced by a short list of the rule findings, so the LLM
+    only judges what the rules cannot.
+    """
+    if not use_rules:
+        return format_system_for_analysis(system_config), None
+    evaluation = evaluate_rules(system_config.get('security_controls', {}))
+    remaining_config = dict(system_config, security_controls=evaluation.remaining_controls)
+    return format_system_for_analysis(remaining_config) + evaluation.as_prompt_note(), evaluation
+
+class PreparedAnalysis(NamedTuple):
+    """A system ready for the LLM, or already answered by the rules or the cache"""
+    description: str
+    evaluation: Optional[RuleEvaluation]
+    cache_key: Optional[str]
+    report: Optional[ComplianceReport]
+    decided_by: Optional[str]  # "rules" or "cache" when report is set
+
+def prepare_analysis(
+    system_config: Dict,
+    model: str = DEFAULT_MODEL,
+    cache: Optional[ReportCache] = None,
+    use_rules: bool = False,
+    policy_name: str = "Security Baseline",
+) -> PreparedAnalysis:
+    """Everything before the LLM call, shared by the sync, async and fleet paths"""
+    description, evaluation = prepare_system_description(system_config, use_rules)
+    if evaluation is not None and evaluation.fully_decided(system_config):
+        report = rule_only_report(system_config, evaluation, policy_name)
+        return PreparedAnalysis(description, evaluation, None, report, "rules")
+    cache_key, cached = get_cached_report(cache, description, model, policy_name)
+    if cached is not None:
+        return PreparedAnalysis(description, evaluation, cache_key, apply_rule_findings(cached, evaluation), "cache")
+    return PreparedAnalysis(description, evaluation, cache_key, None, None)
+
+def finish_analysis(prepared: PreparedAnalysis, result: ComplianceReport,
+                    cache: Optional[ReportCache] = None) -> ComplianceReport:
+    """Everything after the LLM call: store the raw report, then merge rule findings"""
+    if cache is not None:
+        cache.put(prepared.cache_key, result.model_dump())
+    return apply_rule_findings(result, prepared.evaluation)
+
+def rule_only_report(system_config: Dict, evaluation: RuleEvaluation,
+                     policy_name: str = "Security Baseline") -> ComplianceReport:
+    """Build a report for a system the rules fully decide, without calling the LLM"""
+    return ComplianceReport(
+        policy_name=policy_name,
+        system_name=system_config.get('system_name', 'Unknown'),
+        compliant=not evaluation.has_failures,
+        confidence_score=1.0,
+        **evaluation.report_fields(),
+    )
+
+def apply_rule_findings(result: ComplianceReport, evaluation: Optional[RuleEvaluation]) -> ComplianceReport:
+    """Merge deterministic rule findings into the LLM's report"""
+    if evaluation is None:
+        return result
+    update = {
+        field: rule_items + getattr(result, field)
+        for field, rule_items in evaluation.report_fields().items()
+    }
+    # Any failed baseline rule is a policy violation regardless of the LLM's verdict
+    update["compliant"] = result.compliant and not evaluation.has_failures
+    return result.model_copy(update=update)
+
+def print_report(result: ComplianceReport):
+    """Display a compliance report with findings grouped by severity"""
     print(f"System: {result.system_name}")
     print(f"Policy: {result.policy_name}")
     print(f"Compliant: {'✅ YES' if result.compliant else '❌ NO'}")
@@ -188,32 +433,786 @@ Provide a detailed compliance assessment.""")
         print(f"\n✅ RECOMMENDATIONS ({len(result.recommendations)}):")
         for i, rec in enumerate(result.recommendations, 1):
             print(f"  {i}. {rec}")
+
+def emit_report(label: str, result: ComplianceReport,
+                sink: Optional[ReportSink] = None, quiet: bool = False):
+    """Send a finished report to the sink (if any) and, unless quiet, the console"""
+    if sink is not None:
+        sink.write(result, source=label)
+    if not quiet:
+        print(f"\n{'='*70}")
+        print(f"Analyzed: {label}")
+        print(f"{'='*70}\n")
+        print_report(result)
+
+def analyze_system(
+    system_filename: str,
+    policy_name: str = "Security Baseline",
+    cache: Optional[ReportCache] = None,
+    use_rules: bool = False,
+    quiet: bool = False,
+) -> ComplianceReport:
+    """
+    Analyze a target system against security policies
+    
+    Args:
+        system_filename: Name of JSON file in data/target_systems/
+        policy_name: Name of the policy framework to assess against
+        cache: Optional ReportCache; a hit returns the stored report without an LLM call
+        use_rules: Run the deterministic rule pre-pass (lab_2_4_rules) and only ask
+            the LLM about the controls that need judgement
+        quiet: Skip console rendering of the report
+        
+    Returns:
+        ComplianceReport with structured findings
+    """
+    if not quiet:
+        print(f"\n{'='*70}")
+        print(f"Analyzing: {system_filename}")
+        print(f"{'='*70}\n")
+    
+    # Load system configuration
+    system_config = load_target_system(system_filename)
+    return analyze_system_config(system_config, policy_name, cache, use_rules, quiet)
+
+def analyze_system_config(
+    system_config: Dict,
+    policy_name: str = "Security Baseline",
+    cache: Optional[ReportCache] = None,
+    use_rules: bool = False,
+    quiet: bool = False,
+    scanner: Optional[ComplianceScanner] = None,
+) -> ComplianceReport:
+    """
+    Analyze an already-parsed system configuration (see analyze_system for arguments)
+    
+    The LLM chain comes from `scanner`, or the shared default scanner, so it is
+    built once per process rather than once per system.
+    """
+    scanner = scanner or get_default_scanner()
+    prepared = prepare_analysis(system_config, scanner.model, cache, use_rules, policy_name)
+    
+    if prepared.report is not None:
+        result = prepared.report
+        if not quiet:
+            if prepared.decided_by == "rules":
+                print("(decided by baseline rules - no LLM call)")
+            else:
+                print("(cached result - policy and configuration unchanged)")
+    else:
+        # Run analysis
+        result = finish_analysis(prepared, scanner.chain.invoke({"system": prepared.description}), cache)
+    
+    # Display results
+    if not quiet:
+        print_report(result)
     
     return result
 
-def scan_all_systems():
-    """Scan all systems in the target_systems directory"""
-    target_dir = Path("data/target_systems")
-    json_files = list(target_dir.glob("*.json"))
+def scan_all_systems(
+    concurrency: int = 1,
+    timeout: float = 120.0,
+    max_retries: int = 3,
+    cache: Optional[ReportCache] = None,
+    use_rules: bool = False,
+    sink: Optional[ReportSink] = None,
+    quiet: bool = False,
+):
+    """
+    Scan all systems in the target_systems directory
+    
+    Args:
+        concurrency: Number of systems analyzed at once. 1 scans sequentially;
+            anything higher runs the asyncio fleet scan (see scan_fleet)
+        timeout: Per-request timeout in seconds (fleet mode only)
+        max_retries: Retries per system on timeout or API error (fleet mode only)
+        cache: Optional ReportCache used to skip systems assessed before
+        use_rules: Run the deterministic rule pre-pass before the LLM
+        sink: Optional ReportSink (see lab_2_4_sinks.open_sink) receiving every report
+        quiet: Skip per-finding console output; only the summary is printed
+    """
+    if concurrency > 1:
+        return asyncio.run(scan_all_systems_async(
+            concurrency, timeout, max_retries, cache, use_rules, sink, quiet
+        ))
+    
+    json_files = list(TARGET_DIR.glob("*.json"))
     
     print(f"\n{'='*70}")
     print(f"SCANNING {len(json_files)} SYSTEMS")
     print(f"{'='*70}")
     
     results = []
+    try:
+        for json_file in json_files:
+            result = analyze_system(json_file.name, cache=cache, use_rules=use_rules, quiet=quiet)
+            if sink is not None:
+                sink.write(result, source=json_file.name)
+            results.append(result)
+            if not quiet:
+                print("\n")
+    finally:
+        # Reports already written reach the sink even if a later system raises
+        if sink is not None:
+            sink.flush()
+    print_summary(results)
+    
+    return results
+
+class ScanSummary:
+    """Running totals for a scan, updated one report at a time"""
+    
+    def __init__(self):
+        self.total = 0
+        self.compliant = 0
+        self.failed = 0
+        self.critical_findings = 0
+        self.high_findings = 0
+    
+    def add(self, result: ComplianceReport):
+        self.total += 1
+        self.compliant += result.compliant
+        self.critical_findings += len(result.critical_findings)
+        self.high_findings += len(result.high_findings)
+    
+    @property
+    def non_compliant(self) -> int:
+        return self.total - self.compliant
+    
+    def print(self):
+        print(f"\n{'='*70}")
+        print("SUMMARY")
+        print(f"{'='*70}")
+        print(f"Total Systems: {self.total}")
+        print(f"Compliant: {self.compliant}")
+        print(f"Non-Compliant: {self.non_compliant}")
+        if self.failed:
+            print(f"Failed: {self.failed}")
+        if PREFIX_CACHE_STATS.requests:
+            PREFIX_CACHE_STATS.print()
+
+def print_summary(results: List[ComplianceReport], failed: int = 0):
+    """Print compliant / non-compliant totals for a scan"""
+    summary = ScanSummary()
+    for result in results:
+        summary.add(result)
+    summary.failed = failed
+    summary.print()
+
+# --- Concurrent fleet scanning ---
+
+async def _analyze_with_retry(
+    chain,
+    system_description: str,
+    semaphore: Optional[asyncio.Semaphore],
+    timeout: float,
+    max_retries: int,
+    backoff: float,
+) -> ComplianceReport:
+    """Run one analysis through chain.ainvoke with a timeout and exponential backoff"""
+    for attempt in range(max_retries + 1):
+        # Only hold a concurrency slot while the request is in flight, not while backing off
+        async with semaphore or contextlib.nullcontext():
+            try:
+                return await asyncio.wait_for(
+                    chain.ainvoke({"system": system_description}),
+                    timeout=timeout,
+                )
+            except Exception:
+                if attempt == max_retries:
+                    raise
+        delay = backoff * (2 ** attempt)
+        await asyncio.sleep(delay + random.uniform(0, delay))
+
+async def _bounded_as_completed(
+    coroutines: Iterable[Awaitable], window: int
+) -> AsyncIterator:
+    """
+    Run coroutines with at most `window` tasks alive, yielding results as they finish
+    
+    Coroutines are pulled from the iterable only when a slot frees up, so a
+    lazily produced stream of systems is never materialized in memory.
+    """
+    coroutines = iter(coroutines)
+    pending = set()
+    try:
+        while True:
+            for coroutine in coroutines:
+                pending.add(asyncio.ensure_future(coroutine))
+                if len(pending) >= window:
+                    break
+            if not pending:
+                return
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        # Cancel anything still running if the consumer stops early
+        for task in pending:
+            task.cancel()
+
+async def scan_system_stream(
+    systems: Iterable[Tuple[str, Dict]],
+    concurrency: int = 10,
+    timeout: float = 120.0,
+    max_retries: int = 3,
+    backoff: float = 1.0,
+    model: str = DEFAULT_MODEL,
+    cache: Optional[ReportCache] = None,
+    use_rules: bool = False,
+    scanner: Optional[ComplianceScanner] = None,
+) -> AsyncIterator[Tuple[str, ComplianceReport]]:
+    """
+    Analyze a stream of (label, system_config) pairs concurrently
+    
+    At most `concurrency` LLM requests are in flight at any time, so total
+    scan time scales with the concurrency limit rather than the fleet size.
+    Systems are read from `systems` only as capacity frees up, keeping memory
+    bounded for arbitrarily large inventories. Systems that still fail after
+    `max_retries` are reported and skipped.
+    
+    Args:
+        systems: Iterable of (label, parsed system config) pairs
+        concurrency: Maximum number of simultaneous LLM requests
+        timeout: Per-request timeout in seconds
+        max_retries: Retries per system after a timeout or API error
+        backoff: Base delay in seconds for exponential backoff with jitter
+        model: OpenAI model used for the analysis
+        cache: Optional ReportCache; hits are yielded without an LLM call
+        use_rules: Run the deterministic rule pre-pass; fully rule-decided
+            systems are yielded without an LLM call
+        scanner: ComplianceScanner providing the pooled client (defaults to
+            the shared scanner for `model`)
+        
+    Yields:
+        (label, ComplianceReport) tuples in completion order
+    """
+    scanner = scanner or get_default_scanner(model)
+    model = scanner.model
+    chain = scanner.async_chain()
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def analyze(label: str, system_config: Dict):
+        prepared = prepare_analysis(system_config, model, cache, use_rules)
+        if prepared.report is not None:
+            return label, prepared.report
+        try:
+            result = await _analyze_with_retry(
+                chain, prepared.description, semaphore, timeout, max_retries, backoff
+            )
+            return label, finish_analysis(prepared, result, cache)
+        except Exception as e:
+            print(f"❌ Failed to analyze {label}: {e!r}")
+            return label, None
+    
+    # A window of 2x concurrency keeps the semaphore saturated while requests back off
+    async for label, result in _bounded_as_completed(
+        (analyze(label, config) for label, config in systems), window=2 * concurrency
+    ):
+        if result is not None:
+            yield label, result
+
+async def scan_fleet(
+    json_files: Optional[List[Path]] = None,
+    concurrency: int = 10,
+    timeout: float = 120.0,
+    max_retries: int = 3,
+    backoff: float = 1.0,
+    model: str = DEFAULT_MODEL,
+    cache: Optional[ReportCache] = None,
+    use_rules: bool = False,
+) -> AsyncIterator[Tuple[str, ComplianceReport]]:
+    """
+    Analyze many target system files concurrently, yielding results as each one finishes
+    
+    Args:
+        json_files: Config files to scan (defaults to all of data/target_systems)
+        Other arguments: see scan_system_stream
+        
+    Yields:
+        (filename, ComplianceReport) tuples in completion order
+    """
+    if json_files is None:
+        json_files = list(TARGET_DIR.glob("*.json"))
+    
+    systems = ((f.name, load_target_system(f.name)) for f in json_files)
+    async for filename, result in scan_system_stream(
+        systems, concurrency, timeout, max_retries, backoff, model, cache, use_rules
+    ):
+        yield filename, result
+
+async def scan_all_systems_async(
+    concurrency: int = 10,
+    timeout: float = 120.0,
+    max_retries: int = 3,
+    cache: Optional[ReportCache] = None,
+    use_rules: bool = False,
+    sink: Optional[ReportSink] = None,
+    quiet: bool = False,
+) -> List[ComplianceReport]:
+    """Concurrent version of scan_all_systems that emits reports as they arrive"""
+    json_files = list(TARGET_DIR.glob("*.json"))
+    
+    print(f"\n{'='*70}")
+    print(f"SCANNING {len(json_files)} SYSTEMS (concurrency={concurrency})")
+    print(f"{'='*70}")
+    
+    results = []
+    try:
+        async for filename, result in scan_fleet(
+            json_files, concurrency, timeout, max_retries, cache=cache, use_rules=use_rules
+        ):
+            emit_report(filename, result, sink, quiet)
+            results.append(result)
+    finally:
+        # Keep the reports from a partial run
+        if sink is not None:
+            sink.flush()
+    print_summary(results, failed=len(json_files) - len(results))
+    
+    return results
+
+# --- Batched multi-system prompts ---
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) used for batch sizing"""
+    return len(text) // 4 + 1
+
+def plan_batches(descriptions: List[str], max_batch_size: int, token_budget: int) -> List[List[int]]:
+    """
+    Group system descriptions into batches
+    
+    A batch is closed when it reaches max_batch_size or when adding the next
+    system would push the prompt (policy + systems) over token_budget. A single
+    system that exceeds the budget on its own still gets a batch of one.
+    """
+    policy_tokens = estimate_tokens(BATCH_ANALYSIS_PROMPT.pretty_repr())
+    batches, current, current_tokens = [], [], policy_tokens
+    for i, description in enumerate(descriptions):
+        tokens = estimate_tokens(description)
+        if current and (len(current) >= max_batch_size or current_tokens + tokens > token_budget):
+            batches.append(current)
+            current, current_tokens = [], policy_tokens
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+class BatchAnalysis(NamedTuple):
+    """Reports from analyze_batch, in input order"""
+    reports: List[Optional[ComplianceReport]]  # None for systems whose fallback call failed
+    batched: bool  # True if the reports came from the batched request
+
+def analyze_batch(
+    descriptions: List[str],
+    system_names: List[str],
+    batch_chain=None,
+    single_chain=None,
+) -> BatchAnalysis:
+    """
+    Assess several systems in one request, falling back to one call per system
+    
+    The batched response is accepted only if it contains exactly one report per
+    system and the system names line up; otherwise (or if parsing fails) each
+    system is analyzed on its own with the single-system chain. A system whose
+    fallback call fails is reported and gets None, like a failed system in the
+    sequential inventory scan, so one bad system does not abort the batch.
+    """
+    if len(descriptions) > 1:
+        batch_chain = batch_chain or get_default_scanner().batch_chain
+        systems = "\n\n".join(
+            f"### SYSTEM {i}\n{description}" for i, description in enumerate(descriptions, 1)
+        )
+        try:
+            batch = batch_chain.invoke({
+                "count": len(descriptions),
+                "systems": systems,
+            })
+            reports = _match_batch_reports(batch.reports, system_names)
+            if reports is not None:
+                return BatchAnalysis(reports, True)
+            print(f"⚠️  Batch response did not match {len(descriptions)} systems; retrying individually")
+        except Exception as e:
+            print(f"⚠️  Batch request failed ({e!r}); retrying individually")
+    
+    single_chain = single_chain or get_default_scanner().chain
+    reports = []
+    for description, name in zip(descriptions, system_names):
+        try:
+            reports.append(single_chain.invoke({"system": description}))
+        except Exception as e:
+            print(f"❌ Failed to analyze {name}: {e!r}")
+            reports.append(None)
+    return BatchAnalysis(reports, False)
+
+def _match_batch_reports(reports: List[ComplianceReport], system_names: List[str]) -> Optional[List[ComplianceReport]]:
+    if len(reports) != len(system_names):
+        return None
+    if [r.system_name for r in reports] == system_names:
+        return reports
+    # Tolerate reordering as long as every name maps to exactly one report
+    by_name = {r.system_name: r for r in reports}
+    if len(by_name) == len(reports) and set(by_name) == set(system_names):
+        return [by_name[name] for name in system_names]
+    return None
+
+def scan_all_systems_batched(
+    max_batch_size: int = 5,
+    token_budget: int = 12_000,
+    cache: Optional[ReportCache] = None,
+    use_rules: bool = False,
+    sink: Optional[ReportSink] = None,
+    quiet: bool = False,
+) -> List[ComplianceReport]:
+    """
+    Scan all systems, packing several into each LLM request
+    
+    The ~1.5 KB security policy is sent once per batch instead of once per
+    system, cutting request count by up to max_batch_size.
+    
+    Args:
+        max_batch_size: Maximum systems per request
+        token_budget: Approximate input-token limit per request (policy included)
+        cache: Optional ReportCache; hits are not sent to the LLM
+        use_rules: Run the deterministic rule pre-pass before the LLM
+        sink: Optional ReportSink receiving every report
+        quiet: Skip per-finding console output
+    """
+    json_files = sorted(TARGET_DIR.glob("*.json"))
+    
+    print(f"\n{'='*70}")
+    print(f"SCANNING {len(json_files)} SYSTEMS (batches of up to {max_batch_size})")
+    print(f"{'='*70}")
+    
+    results: Dict[str, ComplianceReport] = {}
+    pending = []  # (filename, system_name, description, evaluation)
     for json_file in json_files:
-        result = analyze_system(json_file.name)
+        system_config = load_target_system(json_file.name)
+        description, evaluation = prepare_system_description(system_config, use_rules)
+        if evaluation is not None and evaluation.fully_decided(system_config):
+            results[json_file.name] = rule_only_report(system_config, evaluation)
+            continue
+        # A single-system report is as good as a batched one; the reverse is not assumed
+        _, cached = get_cached_report(cache, description)
+        if cached is None:
+            _, cached = get_cached_report(cache, description, batched=True)
+        if cached is not None:
+            results[json_file.name] = apply_rule_findings(cached, evaluation)
+            continue
+        pending.append((json_file.name, system_config.get('system_name', 'Unknown'),
+                        description, evaluation))
+    
+    try:
+        batches = plan_batches([item[2] for item in pending], max_batch_size, token_budget)
+        scanner = get_default_scanner()
+        for n, batch in enumerate(batches, 1):
+            items = [pending[i] for i in batch]
+            if not quiet:
+                print(f"\nBatch {n}/{len(batches)}: {', '.join(item[0] for item in items)}")
+            analysis = analyze_batch(
+                [item[2] for item in items], [item[1] for item in items],
+                scanner.batch_chain, scanner.chain,
+            )
+            for (filename, _, description, evaluation), report in zip(items, analysis.reports):
+                if report is None:
+                    continue
+                if cache is not None:
+                    cache.put(analysis_cache_key(description, batched=analysis.batched), report.model_dump())
+                results[filename] = apply_rule_findings(report, evaluation)
+    finally:
+        # Emit every finished report, in file order, even if a later batch raised.
+        # Systems whose analysis failed were reported by analyze_batch and are left out
+        scanned = [f.name for f in json_files if f.name in results]
+        for filename in scanned:
+            emit_report(filename, results[filename], sink, quiet)
+        if sink is not None:
+            sink.flush()
+    
+    ordered = [results[filename] for filename in scanned]
+    print_summary(ordered)
+    return ordered
+
+# --- Streaming inventories (JSONL / NDJSON) ---
+
+def iter_inventory_jsonl(path: str) -> Iterator[Tuple[str, Dict]]:
+    """
+    Lazily parse a JSONL/NDJSON export with one system configuration per line
+    
+    Only one line is held in memory at a time, so multi-GB CMDB exports can be
+    scanned with bounded memory. Blank lines are skipped; malformed lines and
+    lines that are valid JSON but not an object are reported and skipped.
+    
+    Yields:
+        (label, system_config) where label is the system name plus its line number
+    """
+    with open(path, 'rb') as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                system_config = json.loads(line)
+            except ValueError as e:  # JSONDecodeError or invalid UTF-8
+                print(f"⚠️  Skipping malformed record at {path}:{line_no}: {e}")
+                continue
+            if not isinstance(system_config, dict):
+                print(f"⚠️  Skipping malformed record at {path}:{line_no}: "
+                      f"expected a JSON object, got {type(system_config).__name__}")
+                continue
+            yield f"{system_config.get('system_name', 'Unknown')} (line {line_no})", system_config
+
+def scan_inventory(
+    path: str,
+    concurrency: int = 1,
+    timeout: float = 120.0,
+    max_retries: int = 3,
+    cache: Optional[ReportCache] = None,
+    use_rules: bool = False,
+    sink: Optional[ReportSink] = None,
+    quiet: bool = False,
+) -> ScanSummary:
+    """
+    Scan every system in a JSONL inventory without loading it into memory
+    
+    Reports are emitted as they are produced (to `sink` and, unless `quiet`,
+    the console) and only the running summary is kept, so memory use does not
+    grow with the size of the inventory.
+    
+    Returns:
+        ScanSummary with the totals for the whole inventory
+    """
+    print(f"\n{'='*70}")
+    print(f"SCANNING INVENTORY {path}")
+    print(f"{'='*70}")
+    
+    summary = ScanSummary()
+    
+    try:
+        if concurrency > 1:
+            submitted = 0
+        
+            def counted(systems):
+                nonlocal submitted
+                for item in systems:
+                    submitted += 1
+                    yield item
+        
+            async def run():
+                async for label, result in scan_system_stream(
+                    counted(iter_inventory_jsonl(path)), concurrency, timeout, max_retries,
+                    cache=cache, use_rules=use_rules,
+                ):
+                    emit_report(label, result, sink, quiet)
+                    summary.add(result)
+        
+            asyncio.run(run())
+            # scan_system_stream reports failures itself and does not yield them
+            summary.failed = submitted - summary.total
+        else:
+            for label, system_config in iter_inventory_jsonl(path):
+                if not quiet:
+                    print(f"\n{'='*70}")
+                    print(f"Analyzing: {label}")
+                    print(f"{'='*70}\n")
+                try:
+                    result = analyze_system_config(
+                        system_config, cache=cache, use_rules=use_rules, quiet=quiet
+                    )
+                except Exception as e:
+                    print(f"❌ Failed to analyze {label}: {e!r}")
+                    summary.failed += 1
+                    continue
+                if sink is not None:
+                    sink.write(result, source=label)
+                summary.add(result)
+    finally:
+        # Keep the reports from a partial run
+        if sink is not None:
+            sink.flush()
+    summary.print()
+    return summary
+
+# --- Incremental rescans ---
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def read_system_file(json_file: Path) -> Tuple[Dict, Dict]:
+    """
+    Parse a target system file, returning its config and the mtime, size and
+    SHA-256 of exactly the bytes that were parsed (for ScanManifest.record)
+    """
+    stat = json_file.stat()
+    data = json_file.read_bytes()
+    file_state = {
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": hashlib.sha256(data).hexdigest(),
+    }
+    return json.loads(data), file_state
+
+def scan_fingerprint(model: str = DEFAULT_MODEL, use_rules: bool = False,
+                     policy_name: str = "Security Baseline") -> str:
+    """Hash of everything besides the system file that shapes a report"""
+    settings = {
+        "policy": SECURITY_POLICY,
+        "policy_name": policy_name,
+        "prompt": PROMPT_TEMPLATE_TEXT,
+        "model": model,
+        "use_rules": use_rules,
+    }
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()
+
+class ScanManifest:
+    """
+    Persistent record of the last scan of each target system file.
+    
+    For every file it keeps the mtime, size and SHA-256 of the content that was
+    analyzed, plus the resulting report. A file whose mtime and size are
+    unchanged is trusted without reading it; otherwise the content hash decides,
+    so a `touch` or a checkout does not trigger a new LLM call. Entries are only
+    reused under the same scan_fingerprint (policy, prompt, model, rules mode).
+    """
+    
+    def __init__(self, path: str = DEFAULT_MANIFEST_PATH, fingerprint: Optional[str] = None):
+        self.path = Path(path)
+        self.fingerprint = fingerprint or scan_fingerprint()
+        self.entries: Dict[str, Dict] = {}
+        if self.path.exists():
+            with open(self.path, 'r') as f:
+                self.entries = json.load(f).get("files", {})
+    
+    def get_unchanged_report(self, json_file: Path) -> Optional[ComplianceReport]:
+        """Return the previous report if neither the file nor the scan settings changed"""
+        entry = self.entries.get(json_file.name)
+        if entry is None or entry.get("fingerprint") != self.fingerprint:
+            return None
+        stat = json_file.stat()
+        if stat.st_mtime_ns != entry["mtime_ns"] or stat.st_size != entry["size"]:
+            if _file_sha256(json_file) != entry["sha256"]:
+                return None
+            # Same content with a new timestamp; remember it so the next check is a stat() only
+            entry["mtime_ns"], entry["size"] = stat.st_mtime_ns, stat.st_size
+        try:
+            return ComplianceReport.model_validate(entry["report"])
+        except ValidationError:
+            return None
+    
+    def record(self, json_file: Path, report: ComplianceReport, file_state: Dict):
+        """Store a report with the file state returned by read_system_file()"""
+        self.entries[json_file.name] = dict(
+            file_state, fingerprint=self.fingerprint, report=report.model_dump()
+        )
+    
+    def prune(self, existing: List[Path]):
+        """Forget files that no longer exist in the target directory"""
+        names = {f.name for f in existing}
+        for name in list(self.entries):
+            if name not in names:
+                del self.entries[name]
+    
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({"files": self.entries}, f)
+        # Atomic replace so an interrupted save never leaves a truncated manifest
+        os.replace(tmp_path, self.path)
+
+async def _rescan_fleet(manifest: ScanManifest, changed: List[Path], concurrency: int,
+                        timeout: float, max_retries: int, cache: Optional[ReportCache],
+                        use_rules: bool, sink: Optional[ReportSink], quiet: bool, model: str):
+    results = []
+    by_name = {f.name: f for f in changed}
+    file_states: Dict[str, Dict] = {}
+    
+    def systems():
+        for json_file in changed:
+            system_config, file_states[json_file.name] = read_system_file(json_file)
+            yield json_file.name, system_config
+    
+    async for filename, result in scan_system_stream(
+        systems(), concurrency, timeout, max_retries, model=model, cache=cache, use_rules=use_rules
+    ):
+        emit_report(filename, result, sink, quiet)
+        manifest.record(by_name[filename], result, file_states.pop(filename))
         results.append(result)
-        print("\n")
+    return results
+
+def rescan_changed_systems(
+    manifest_path: str = DEFAULT_MANIFEST_PATH,
+    concurrency: int = 1,
+    timeout: float = 120.0,
+    max_retries: int = 3,
+    cache: Optional[ReportCache] = None,
+    use_rules: bool = False,
+    sink: Optional[ReportSink] = None,
+    quiet: bool = False,
+    model: str = DEFAULT_MODEL,
+) -> List[ComplianceReport]:
+    """
+    Re-assess only new or modified target systems
+    
+    Unchanged files reuse the report stored in the manifest from the previous
+    run; everything else is analyzed (concurrently when concurrency > 1) and
+    recorded for next time under the hash of the exact bytes analyzed. Changing
+    the policy, prompt, model or use_rules invalidates every stored report.
+    Only the newly produced reports are written to `sink`.
+    
+    Returns:
+        Reports for every system currently in data/target_systems
+    """
+    manifest = ScanManifest(manifest_path, scan_fingerprint(model, use_rules))
+    json_files = sorted(TARGET_DIR.glob("*.json"))
+    manifest.prune(json_files)
+    
+    results = []
+    changed = []
+    for json_file in json_files:
+        report = manifest.get_unchanged_report(json_file)
+        if report is None:
+            changed.append(json_file)
+        else:
+            results.append(report)
     
-    # Summary
     print(f"\n{'='*70}")
-    print("SUMMARY")
+    print(f"RESCANNING {len(changed)} NEW/CHANGED SYSTEMS ({len(results)} unchanged)")
     print(f"{'='*70}")
-    compliant_count = sum(1 for r in results if r.compliant)
-    print(f"Total Systems: {len(results)}")
-    print(f"Compliant: {compliant_count}")
-    print(f"Non-Compliant: {len(results) - compliant_count}")
+    
+    try:
+        if concurrency > 1:
+            results.extend(asyncio.run(
+                _rescan_fleet(manifest, changed, concurrency, timeout, max_retries,
+                              cache, use_rules, sink, quiet, model)
+            ))
+        else:
+            scanner = get_default_scanner(model)
+            for json_file in changed:
+                if not quiet:
+                    print(f"\n{'='*70}")
+                    print(f"Analyzing: {json_file.name}")
+                    print(f"{'='*70}\n")
+                system_config, file_state = read_system_file(json_file)
+                result = analyze_system_config(
+                    system_config, cache=cache, use_rules=use_rules, quiet=quiet, scanner=scanner
+                )
+                if sink is not None:
+                    sink.write(result, source=json_file.name)
+                manifest.record(json_file, result, file_state)
+                results.append(result)
+                if not quiet:
+                    print("\n")
+    finally:
+        # Keep progress from a partial run
+        manifest.save()
+        if sink is not None:
+            sink.flush()
+    
+    print_summary(results, failed=len(json_files) - len(results))
     
     return results
 
@@ -223,5 +1222,31 @@ if __name__ == "__main__":
     # Option 1: Scan a specific system
     # result = analyze_system("api_vulnerable.json")
     
+    # Option 1b: Reuse one client and chain for many parsed configs
+    # with ComplianceScanner(use_rules=True) as scanner:
+    #     report = scanner.analyze(load_target_system("api_vulnerable.json"))
+    
     # Option 2: Scan all systems
     results = scan_all_systems()
+    
+    # Option 3: Concurrent fleet scan (10 requests in flight)
+    # results = scan_all_systems(concurrency=10)
+    
+    # Option 4: Reuse stored reports for unchanged systems (data/.cache/)
+    # results = scan_all_systems(cache=ReportCache(ttl_seconds=24 * 3600))
+    
+    # Option 5: Only re-assess files changed since the last rescan
+    # results = rescan_changed_systems()
+    
+    # Option 6: Decide mechanical baseline checks with rules, LLM only for judgement calls
+    # results = scan_all_systems(use_rules=True)
+    
+    # Option 7: Pack several systems into each request (policy sent once per batch)
+    # results = scan_all_systems_batched(max_batch_size=5)
+    
+    # Option 8: Stream a large JSONL/NDJSON inventory export with bounded memory
+    # summary = scan_inventory("cmdb_export.jsonl", concurrency=10)
+    
+    # Option 9: Write reports to a queryable file instead of the console
+    # with open_sink("data/.cache/reports.sqlite") as sink:  # or .jsonl / .parquet
+    #     summary = scan_inventory("cmdb_export.jsonl", concurrency=10, sink=sink, quiet=True)
@@ -0,0 +1,99 @@
+import hashlib
+import threading
+from typing import Dict
+
+from langchain_core.messages import SystemMessage
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableLambda
+
+# Prompt layout for provider-side prefix caching.
+#
+# Providers such as OpenAI cache the longest identical prompt prefix between
+# requests (OpenAI: prefixes of 1024+ tokens) and bill cached tokens at a
+# discount with lower latency. To benefit, everything that never changes must
+# come first and be byte-identical on every call.
+
+class PromptLayout:
+    """
+    A prompt split into a static prefix and a dynamic suffix.
+
+    The prefix is rendered once into a SystemMessage object that every request
+    reuses as-is; only the suffix is templated per call. `cache_key` identifies
+    the prefix and is sent as a routing hint so requests sharing the prefix land
+    on the same provider cache.
+    """
+
+    def __init__(self, name: str, static_prefix: str, dynamic_suffix: str):
+        self.name = name
+        self.static_prefix = static_prefix
+        self.prefix_message = SystemMessage(content=static_prefix)
+        prefix_hash = hashlib.sha256(static_prefix.encode("utf-8")).hexdigest()[:16]
+        self.cache_key = f"{name}-{prefix_hash}"
+        self.template = ChatPromptTemplate.from_messages([
+            self.prefix_message,
+            ("user", dynamic_suffix),
+        ])
+
+    def cache_hints(self) -> Dict:
+        """Keyword arguments for ChatOpenAI that enable prompt-cache routing"""
+        return {"extra_body": {"prompt_cache_key": self.cache_key}}
+
+class PrefixCacheStats:
+    """Process-wide counters for provider prompt-cache hits"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.cache_hits = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+
+    def record(self, usage_metadata: Dict):
+        input_tokens = usage_metadata.get("input_tokens", 0)
+        cached = (usage_metadata.get("input_token_details") or {}).get("cache_read", 0) or 0
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += input_tokens
+            self.cached_tokens += cached
+            self.cache_hits += cached > 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of requests that reused a cached prefix"""
+        return self.cache_hits / self.requests if self.requests else 0.0
+
+    @property
+    def cached_token_ratio(self) -> float:
+        """Fraction of prompt tokens served from the provider cache"""
+        return self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+
+    def print(self):
+        print(
+            f"Prompt Prefix Cache: {self.cache_hits}/{self.requests} requests hit "
+            f"({self.hit_rate:.1%}), {self.cached_tokens}/{self.prompt_tokens} prompt tokens cached "
+            f"({self.cached_token_ratio:.1%})"
+        )
+
+PREFIX_CACHE_STATS = PrefixCacheStats()
+
+def track_prefix_cache(stats: PrefixCacheStats = PREFIX_CACHE_STATS):
+    """
+    Runnable to place after `llm.with_structured_output(..., include_raw=True)`.
+
+    Records the cache usage reported on the raw message and returns the parsed
+    object, so the chain's output is the same as without include_raw.
+    """
+    def unwrap(output: Dict):
+        raw = output.get("raw")
+        if raw is not None and getattr(raw, "usage_metadata", None):
+            stats.record(raw.usage_metadata)
+        if output.get("parsing_error") is not None:
+            raise output["parsing_error"]
+        if output.get("parsed") is None:
+            raise ValueError("Model returned no structured output")
+        return output["parsed"]
+
+    return RunnableLambda(unwrap)
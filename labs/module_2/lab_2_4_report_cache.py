@@ -0,0 +1,129 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+# Default location for the on-disk cache (relative to the repo root, like data/target_systems)
+DEFAULT_CACHE_PATH = "data/.cache/compliance_reports.sqlite"
+
+def report_cache_key(policy: str, policy_name: str, system_description: str,
+                     model: str, prompt_template: str) -> str:
+    """
+    Content-address an assessment request.
+
+    Any change to the policy text or name, the formatted system, the model or
+    the prompt produces a different key, so stale reports are never returned.
+    """
+    digest = hashlib.sha256()
+    for part in (policy, policy_name, system_description, model, prompt_template):
+        encoded = part.encode("utf-8")
+        # Length-prefix each part so ("ab", "c") and ("a", "bc") hash differently
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+class ReportCache:
+    """
+    Persistent SQLite cache of ComplianceReport results.
+
+    Entries expire after `ttl_seconds` (None = never) and the cache is trimmed
+    to the `max_entries` most recently used reports. Eviction runs on open and
+    then once every EVICT_INTERVAL writes rather than on each one, so the cache
+    can briefly hold up to EVICT_INTERVAL extra entries; expired entries are
+    never returned in the meantime.
+    """
+
+    EVICT_INTERVAL = 256
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        ttl_seconds: Optional[float] = 7 * 24 * 3600,
+        max_entries: Optional[int] = 50_000,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS reports (
+                key TEXT PRIMARY KEY,
+                report TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_reports_accessed ON reports(accessed_at)")
+        self._evict(time.time())
+        self._conn.commit()
+        self._writes_since_evict = 0
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the stored report as a dict, or None on a miss or expired entry"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT report, created_at FROM reports WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            report, created_at = row
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM reports WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE reports SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(report)
+
+    def put(self, key: str, report: Dict):
+        """Store a report (as returned by model_dump()), evicting every EVICT_INTERVAL writes"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO reports (key, report, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(report), now, now),
+            )
+            self._writes_since_evict += 1
+            if self._writes_since_evict >= self.EVICT_INTERVAL:
+                self._evict(now)
+                self._writes_since_evict = 0
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        if self.ttl_seconds is not None:
+            self._conn.execute("DELETE FROM reports WHERE created_at < ?", (now - self.ttl_seconds,))
+        if self.max_entries is not None:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM reports").fetchone()
+            if count > self.max_entries:
+                # Drop the least recently used entries
+                self._conn.execute(
+                    """DELETE FROM reports WHERE key IN (
+                        SELECT key FROM reports ORDER BY accessed_at ASC LIMIT ?
+                    )""",
+                    (count - self.max_entries,),
+                )
+
+    def clear(self):
+        """Remove every cached report"""
+        with self._lock:
+            self._conn.execute("DELETE FROM reports")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,285 @@
+import copy
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+# Deterministic pre-pass for the Lab 2.4 scanner.
+#
+# Baseline requirements that are pure comparisons (TLS >= 1.2, MFA on, log
+# retention >= 90 days, ...) are declared below and checked directly against
+# the parsed `security_controls` dict. Only the controls no rule covers are
+# sent to the LLM for judgement.
+
+SEVERITIES = ("critical", "high", "medium", "low")
+
+class Rule(NamedTuple):
+    """A single declarative baseline check"""
+    rule_id: str
+    severity: str  # one of SEVERITIES
+    path: str  # dotted path into security_controls
+    op: str  # key into OPERATORS
+    expected: Any
+    finding: str  # may reference {actual}
+    recommendation: str
+    when: Optional[Tuple[str, str, Any]] = None  # (path, op, expected) precondition
+
+def _version_tuple(value) -> Tuple[int, ...]:
+    return tuple(int(part) for part in str(value).split(".") if part.isdigit())
+
+OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "eq": lambda actual, expected: actual == expected,
+    "in": lambda actual, expected: actual in expected,
+    "gte": lambda actual, expected: actual is not None and actual >= expected,
+    "lte": lambda actual, expected: actual is not None and actual <= expected,
+    "excludes": lambda actual, expected: isinstance(actual, list) and expected not in actual,
+    "version_gte": lambda actual, expected: (
+        actual is not None and _version_tuple(actual) >= _version_tuple(expected)
+    ),
+}
+
+_SSH_ENABLED = ("network.ssh_access.enabled", "eq", True)
+_AT_REST_ENABLED = ("encryption.at_rest.enabled", "eq", True)
+
+# Mechanical checks from the SECURITY BASELINE REQUIREMENTS in lab_2_4_local_scanner.py
+BASELINE_RULES: List[Rule] = [
+    # 1. Encryption
+    Rule("ENC-1", "critical", "encryption.at_rest.enabled", "eq", True,
+         "Encryption at rest is not enabled",
+         "Enable AES-256 encryption for all data at rest"),
+    Rule("ENC-2", "high", "encryption.at_rest.algorithm", "in", ("AES-256", "AES-256-GCM"),
+         "Data at rest uses {actual} instead of AES-256",
+         "Switch at-rest encryption to AES-256", when=_AT_REST_ENABLED),
+    Rule("ENC-3", "medium", "encryption.at_rest.key_rotation_days", "lte", 90,
+         "Encryption keys rotate every {actual} days (policy: 90 days or less)",
+         "Rotate encryption keys at least every 90 days", when=_AT_REST_ENABLED),
+    Rule("ENC-4", "critical", "encryption.in_transit.enabled", "eq", True,
+         "Encryption in transit is not enabled",
+         "Enable TLS 1.2 or higher for all data in transit"),
+    Rule("ENC-5", "critical", "encryption.in_transit.tls_version", "version_gte", "1.2",
+         "In-transit TLS version is {actual} (policy: TLS 1.2 or higher)",
+         "Upgrade in-transit encryption to TLS 1.2 or higher"),
+    # 2. Authentication
+    Rule("AUTH-1", "high", "authentication.mfa_enabled", "eq", True,
+         "Multi-factor authentication is not enabled",
+         "Enable MFA for all users"),
+    Rule("AUTH-2", "high", "authentication.mfa_enforcement", "eq", "required",
+         "MFA enforcement is '{actual}' (policy: required for all users)",
+         "Make MFA mandatory for all users"),
+    Rule("AUTH-3", "high", "authentication.password_policy.min_length", "gte", 12,
+         "Minimum password length is {actual} (policy: at least 12)",
+         "Require passwords of at least 12 characters"),
+    Rule("AUTH-4", "medium", "authentication.password_policy.complexity", "eq", "high",
+         "Password complexity is '{actual}' (policy: high)",
+         "Require high password complexity"),
+    Rule("AUTH-5", "medium", "authentication.password_policy.rotation_days", "lte", 90,
+         "Passwords rotate every {actual} days (policy: 90 days or less)",
+         "Enforce password rotation every 90 days"),
+    Rule("AUTH-6", "medium", "authentication.session_management.timeout_minutes", "lte", 30,
+         "Session timeout is {actual} minutes (policy: 30 minutes or less)",
+         "Reduce session timeout to 30 minutes or less"),
+    # 3. Network security
+    Rule("NET-1", "critical", "network.firewall_enabled", "eq", True,
+         "Firewall is not enabled",
+         "Enable the firewall and restrict exposed ports"),
+    Rule("NET-2", "critical", "network.ssh_access.key_based_only", "eq", True,
+         "SSH allows password authentication",
+         "Restrict SSH to key-based authentication", when=_SSH_ENABLED),
+    Rule("NET-3", "critical", "network.ssh_access.allowed_ips", "excludes", "0.0.0.0/0",
+         "SSH is reachable from any IP address ({actual})",
+         "Restrict SSH access to specific IP ranges", when=_SSH_ENABLED),
+    # 4. Logging & monitoring
+    Rule("LOG-1", "high", "logging_monitoring.centralized_logging", "eq", True,
+         "Centralized logging is not enabled",
+         "Enable centralized logging"),
+    Rule("LOG-2", "high", "logging_monitoring.log_retention_days", "gte", 90,
+         "Logs are retained for {actual} days (policy: at least 90)",
+         "Retain logs for at least 90 days"),
+    Rule("LOG-3", "medium", "logging_monitoring.real_time_alerts", "eq", True,
+         "Real-time alerting is not configured",
+         "Configure real-time security alerting"),
+    Rule("LOG-4", "high", "logging_monitoring.audit_trail", "eq", True,
+         "Audit trails are not maintained",
+         "Enable audit trails"),
+    # 5. Access control
+    Rule("AC-1", "medium", "access_control.rbac_enabled", "eq", True,
+         "Role-based access control is not implemented",
+         "Implement RBAC"),
+    Rule("AC-2", "medium", "access_control.least_privilege", "eq", True,
+         "Least privilege is not enforced",
+         "Enforce least-privilege access"),
+    Rule("AC-3", "medium", "access_control.privileged_access_management", "eq", True,
+         "Privileged access is not managed separately",
+         "Introduce privileged access management"),
+    Rule("AC-4", "medium", "access_control.review_frequency_days", "lte", 90,
+         "Access reviews every {actual} days (policy: quarterly)",
+         "Run access reviews at least quarterly"),
+    # 6. Vulnerability management
+    Rule("VULN-1", "high", "vulnerability_management.automated_scanning", "eq", True,
+         "Automated vulnerability scanning is not enabled",
+         "Deploy automated vulnerability scanning"),
+    Rule("VULN-2", "high", "vulnerability_management.scan_frequency", "in", ("daily", "weekly"),
+         "Vulnerability scans run '{actual}' (policy: at least weekly)",
+         "Run vulnerability scans at least weekly"),
+    Rule("VULN-3", "high", "vulnerability_management.critical_patch_sla_hours", "lte", 48,
+         "Critical patch SLA is {actual} hours (policy: 48 hours or less)",
+         "Apply critical patches within 48 hours"),
+    Rule("VULN-4", "medium", "vulnerability_management.high_patch_sla_hours", "lte", 168,
+         "High patch SLA is {actual} hours (policy: 7 days or less)",
+         "Apply high-severity patches within 7 days"),
+    # 7. Data protection
+    Rule("DP-1", "high", "data_protection.backup_enabled", "eq", True,
+         "Backups are not enabled",
+         "Enable daily encrypted backups"),
+    Rule("DP-2", "high", "data_protection.backup_encryption", "eq", True,
+         "Backups are not encrypted",
+         "Encrypt all backups"),
+    Rule("DP-3", "medium", "data_protection.backup_frequency", "in", ("hourly", "daily"),
+         "Backups run '{actual}' (policy: at least daily)",
+         "Back up at least daily"),
+    Rule("DP-4", "medium", "data_protection.disaster_recovery_tested", "eq", True,
+         "Disaster recovery has not been tested",
+         "Test disaster recovery at least annually"),
+    Rule("DP-5", "high", "data_protection.rto_hours", "lte", 8,
+         "RTO is {actual} hours (policy: 8 hours or less)",
+         "Reduce RTO to 8 hours or less"),
+    Rule("DP-6", "high", "data_protection.rpo_hours", "lte", 4,
+         "RPO is {actual} hours (policy: 4 hours or less)",
+         "Reduce RPO to 4 hours or less"),
+]
+
+_MISSING = object()
+
+def _lookup(controls: Dict, keys: Tuple[str, ...]):
+    node = controls
+    for key in keys:
+        if not isinstance(node, dict) or key not in node:
+            return _MISSING
+        node = node[key]
+    return node
+
+def _compile_check(path: str, op: str, expected: Any):
+    """Resolve the path and operator once so evaluation is a dict walk plus one call"""
+    keys = tuple(path.split("."))
+    compare = OPERATORS[op]
+
+    def check(controls: Dict):
+        actual = _lookup(controls, keys)
+        if actual is _MISSING:
+            return actual, None
+        try:
+            return actual, compare(actual, expected)
+        except TypeError:
+            # e.g. allowed_ports: "all" compared against a number
+            return actual, False
+
+    return check
+
+class RuleEvaluation:
+    """Outcome of running the rule engine against one system's security_controls"""
+
+    def __init__(self, controls: Dict):
+        self.controls = controls
+        self.findings: Dict[str, List[str]] = {severity: [] for severity in SEVERITIES}
+        self.recommendations: List[str] = []
+        self.passed: List[str] = []
+        self.failed: List[str] = []
+        self.undecided: List[str] = []
+        self.covered_paths: Set[str] = set()
+
+    @property
+    def has_failures(self) -> bool:
+        return bool(self.failed)
+
+    @property
+    def remaining_controls(self) -> Dict:
+        """security_controls with every rule-decided setting removed (what still needs judgement)"""
+        remaining = copy.deepcopy(self.controls)
+        for path in self.covered_paths:
+            *parents, leaf = path.split(".")
+            node = remaining
+            for key in parents:
+                node = node.get(key) if isinstance(node, dict) else None
+            if isinstance(node, dict):
+                node.pop(leaf, None)
+        return _drop_empty(remaining)
+
+    def fully_decided(self, system_config: Dict) -> bool:
+        """True when no control or known issue is left for the LLM to judge"""
+        return not self.remaining_controls and not system_config.get("known_issues")
+
+    def as_prompt_note(self) -> str:
+        """
+        Short note appended to the reduced system description.
+
+        Rule findings are merged into the report afterwards, so the LLM only
+        needs to know that the omitted settings were already checked.
+        """
+        decided = len(self.passed) + len(self.failed)
+        return (
+            f"\n\nNote: {decided} baseline requirements were verified by automated checks "
+            f"({len(self.failed)} failed) and their settings are omitted above. "
+            "Assess only the controls and issues listed."
+        )
+
+    def report_fields(self) -> Dict[str, Any]:
+        """Findings in the shape of ComplianceReport fields"""
+        fields = {f"{severity}_findings": list(self.findings[severity]) for severity in SEVERITIES}
+        fields["recommendations"] = list(self.recommendations)
+        return fields
+
+def _drop_empty(node):
+    if isinstance(node, dict):
+        pruned = {key: _drop_empty(value) for key, value in node.items()}
+        return {key: value for key, value in pruned.items() if value != {}}
+    return node
+
+class RuleEngine:
+    """Compiled set of baseline rules"""
+
+    def __init__(self, rules: List[Rule] = BASELINE_RULES):
+        for rule in rules:
+            if rule.severity not in SEVERITIES:
+                raise ValueError(f"Rule {rule.rule_id}: unknown severity '{rule.severity}'")
+            if rule.op not in OPERATORS or (rule.when and rule.when[1] not in OPERATORS):
+                raise ValueError(f"Rule {rule.rule_id}: unknown operator")
+        self.rules = list(rules)
+        self._compiled = [
+            (rule, _compile_check(rule.path, rule.op, rule.expected),
+             _compile_check(*rule.when) if rule.when else None)
+            for rule in self.rules
+        ]
+
+    def evaluate(self, controls: Dict) -> RuleEvaluation:
+        evaluation = RuleEvaluation(controls)
+        for rule, check, precondition in self._compiled:
+            if precondition is not None:
+                _, applies = precondition(controls)
+                if applies is None:
+                    evaluation.undecided.append(rule.rule_id)
+                    continue
+                evaluation.covered_paths.add(rule.when[0])
+                if not applies:
+                    # Not applicable (e.g. SSH disabled); the setting needs no judgement either
+                    evaluation.covered_paths.add(rule.path)
+                    evaluation.passed.append(rule.rule_id)
+                    continue
+            actual, ok = check(controls)
+            if ok is None:
+                evaluation.undecided.append(rule.rule_id)
+                continue
+            evaluation.covered_paths.add(rule.path)
+            if ok:
+                evaluation.passed.append(rule.rule_id)
+            else:
+                evaluation.failed.append(rule.rule_id)
+                if actual is None:
+                    finding = f"{rule.path} is not configured ({rule.recommendation})"
+                else:
+                    finding = rule.finding.format(actual=actual)
+                evaluation.findings[rule.severity].append(f"{rule.rule_id}: {finding}")
+                evaluation.recommendations.append(rule.recommendation)
+        return evaluation
+
+DEFAULT_ENGINE = RuleEngine()
+
+def evaluate_rules(controls: Dict) -> RuleEvaluation:
+    """Run the baseline rules against a parsed security_controls dict"""
+    return DEFAULT_ENGINE.evaluate(controls)
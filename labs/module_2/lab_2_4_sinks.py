@@ -0,0 +1,165 @@
+import json
+import sqlite3
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+# Machine-readable outputs for the Lab 2.4 scanner.
+#
+# Sinks buffer ComplianceReport rows and write them in bulk, so a fleet scan
+# spends its time on analysis rather than console I/O, and dashboards can
+# query the results without re-running the scan.
+
+SEVERITY_FIELDS = ("critical_findings", "high_findings", "medium_findings", "low_findings")
+
+def report_to_row(report: BaseModel, source: Optional[str] = None) -> Dict:
+    """Flatten a ComplianceReport into a row with per-severity counts"""
+    row = report.model_dump()
+    row["source"] = source
+    row["scanned_at"] = datetime.now(timezone.utc).isoformat()
+    for field in SEVERITY_FIELDS:
+        row[field.replace("_findings", "_count")] = len(row[field])
+    return row
+
+class ReportSink(ABC):
+    """
+    Base class for buffered report writers.
+
+    Subclasses implement _write_rows(); rows are handed over in batches of
+    `batch_size` and any remainder is written on flush()/close().
+    """
+
+    def __init__(self, path: str, batch_size: int = 500):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.rows_written = 0
+        self._buffer: List[Dict] = []
+
+    def write(self, report: BaseModel, source: Optional[str] = None):
+        self._buffer.append(report_to_row(report, source))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._write_rows(self._buffer)
+            self.rows_written += len(self._buffer)
+            self._buffer = []
+
+    def close(self):
+        self.flush()
+        self._close()
+
+    @abstractmethod
+    def _write_rows(self, rows: List[Dict]):
+        ...
+
+    def _close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+class JsonlSink(ReportSink):
+    """Append one JSON object per report to a .jsonl file"""
+
+    def __init__(self, path: str, batch_size: int = 500):
+        super().__init__(path, batch_size)
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _write_rows(self, rows: List[Dict]):
+        self._file.write("".join(json.dumps(row) + "\n" for row in rows))
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
+
+class SqliteSink(ReportSink):
+    """Insert reports into a compliance_reports table (findings stored as JSON arrays)"""
+
+    COLUMNS = (
+        "scanned_at", "source", "system_name", "policy_name", "compliant", "confidence_score",
+        "critical_count", "high_count", "medium_count", "low_count",
+        "critical_findings", "high_findings", "medium_findings", "low_findings", "recommendations",
+    )
+    LIST_COLUMNS = {"critical_findings", "high_findings", "medium_findings", "low_findings", "recommendations"}
+
+    def __init__(self, path: str, batch_size: int = 500):
+        super().__init__(path, batch_size)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS compliance_reports (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                scanned_at TEXT, source TEXT, system_name TEXT, policy_name TEXT,
+                compliant INTEGER, confidence_score REAL,
+                critical_count INTEGER, high_count INTEGER, medium_count INTEGER, low_count INTEGER,
+                critical_findings TEXT, high_findings TEXT, medium_findings TEXT, low_findings TEXT,
+                recommendations TEXT
+            )"""
+        )
+        self._conn.commit()
+
+    def _write_rows(self, rows: List[Dict]):
+        placeholders = ", ".join("?" for _ in self.COLUMNS)
+        self._conn.executemany(
+            f"INSERT INTO compliance_reports ({', '.join(self.COLUMNS)}) VALUES ({placeholders})",
+            [
+                tuple(json.dumps(row[c]) if c in self.LIST_COLUMNS else row[c] for c in self.COLUMNS)
+                for row in rows
+            ],
+        )
+        self._conn.commit()
+
+    def _close(self):
+        self._conn.close()
+
+class ParquetSink(ReportSink):
+    """Write reports to a Parquet file, one row group per batch (requires pyarrow)"""
+
+    def __init__(self, path: str, batch_size: int = 5000):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("ParquetSink requires pyarrow: pip install pyarrow") from e
+        super().__init__(path, batch_size)
+        self._pa = pa
+        string_list = pa.list_(pa.string())
+        self._schema = pa.schema([
+            ("scanned_at", pa.string()), ("source", pa.string()),
+            ("system_name", pa.string()), ("policy_name", pa.string()),
+            ("compliant", pa.bool_()), ("confidence_score", pa.float64()),
+            ("critical_count", pa.int32()), ("high_count", pa.int32()),
+            ("medium_count", pa.int32()), ("low_count", pa.int32()),
+            ("critical_findings", string_list), ("high_findings", string_list),
+            ("medium_findings", string_list), ("low_findings", string_list),
+            ("recommendations", string_list),
+        ])
+        self._writer = pq.ParquetWriter(str(self.path), self._schema)
+
+    def _write_rows(self, rows: List[Dict]):
+        table = self._pa.Table.from_pylist(rows, schema=self._schema)
+        self._writer.write_table(table)
+
+    def _close(self):
+        self._writer.close()
+
+def open_sink(path: str, batch_size: Optional[int] = None) -> ReportSink:
+    """Pick a sink from the file extension (.jsonl, .sqlite/.db, .parquet)"""
+    suffix = Path(path).suffix.lower()
+    sinks = {
+        ".jsonl": JsonlSink, ".ndjson": JsonlSink,
+        ".sqlite": SqliteSink, ".db": SqliteSink,
+        ".parquet": ParquetSink,
+    }
+    if suffix not in sinks:
+        raise ValueError(f"Unsupported report sink '{suffix}' (use .jsonl, .sqlite or .parquet)")
+    sink_cls = sinks[suffix]
+    return sink_cls(path) if batch_size is None else sink_cls(path, batch_size)